@@ -0,0 +1,115 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from rest_framework.exceptions import APIException
+from .caching import cache_timeouts, count
+from .pagination import json_chunk
+from .renderers import FastJSONRenderer
+from . import views
+
+# ? async twins of the read endpoints for ASGI servers. Filters, ETags, throttles and the response cache are
+# ? the ones declared on the DRF view; only the database reads and the response writing are async
+
+
+def json_response(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type="application/json")
+
+
+def prepare(view, request, kwargs):
+    """
+    the synchronous part: throttles, conditional GET, response cache and filters. Returns either a finished
+    response, cached data, or the queryset to read asynchronously. Runs in a worker thread, as the session
+    lookup behind the throttles touches the database
+    """
+    view.request = view.initialize_request(request, **kwargs)
+    view.headers = {}
+    try:
+        view.check_throttles(view.request)
+    except APIException as error:
+        response = json_response({"detail": str(error.detail)}, status=error.status_code)
+        if getattr(error, "wait", None):
+            response["Retry-After"] = str(int(error.wait))
+        return response, None
+
+    not_modified = view.conditional_response(request, **kwargs)
+    if not_modified is not None:
+        return view.patch_conditional_headers(not_modified), None
+
+    view.cache_key = None
+    view.cache_hit = False
+    if cache_timeouts().get(view.cache_scope):
+        view.cache_key = view.get_cache_key(view.request)
+        data = cache.get(view.cache_key)
+        if data is not None:
+            count(view.cache_scope, "hit")
+            view.cache_hit = True
+            return None, data
+
+    try:
+        view.plan = view.get_serializer().selected_plan()
+        queryset = view.filter_queryset(view.get_queryset())
+        if getattr(view, "is_full_listing", bool)() and not view.wants_stream():
+            # ? cursor pages are small, they reuse the DRF paginator here instead of an async copy of it
+            page = view.paginate_queryset(queryset)
+            return None, view.get_paginated_response(view.get_serializer(page, many=True).data).data
+    except APIException as error:
+        return json_response(error.detail, status=error.status_code), None
+    return None, queryset
+
+
+async def stream_rows(queryset, serializer_class, chunk_size=2000, plan=None):
+    fields = plan[0] if plan else [i[0] for i in serializer_class.compiled()]
+    yield "["
+    first = True
+    chunk = []
+    # ? named rows: a plain values_list() opens its cursor as soon as it's iterated, outside aiterator()'s thread
+    async for row in queryset.values_list(*fields, named=True).aiterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield json_chunk(serializer_class, chunk, first, plan)
+            first = False
+            chunk = []
+    if chunk:
+        yield json_chunk(serializer_class, chunk, first, plan)
+    yield "]"
+
+
+def async_list_view(view_class):
+    """an async function view serving the same data as the DRF list view `view_class`"""
+
+    async def view(request, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+
+        instance = view_class(args=(), kwargs=kwargs, format_kwarg=None)
+        response, data = await sync_to_async(prepare)(instance, request, kwargs)
+        if response is not None:
+            return response
+
+        serializer_class = instance.get_serializer_class()
+        if hasattr(data, "values_list"):
+            if getattr(instance, "wants_stream", bool)():
+                rows = stream_rows(data.order_by("pk"), serializer_class, plan=instance.plan)
+                return instance.patch_conditional_headers(StreamingHttpResponse(rows, content_type="application/json"))
+            fields = instance.plan[0] if instance.plan else [i[0] for i in serializer_class.compiled()]
+            data = serializer_class.to_rows([row async for row in data.values_list(*fields)], instance.plan)
+
+        response = json_response(data)
+        # ? same bookkeeping as CachedResponseMixin: rows and cursor pages are stored on a miss, streams never
+        if instance.cache_key:
+            if not instance.cache_hit:
+                await sync_to_async(count)(instance.cache_scope, "miss")
+                await cache.aset(instance.cache_key, data, cache_timeouts()[instance.cache_scope])
+            response["X-Cache"] = "HIT" if instance.cache_hit else "MISS"
+        return instance.patch_conditional_headers(response)
+
+    view.__name__ = f"async_{view_class.__name__}"
+    return view
+
+
+async_driver_data = async_list_view(views.getDriverData)
+async_driver_results = async_list_view(views.getDriverResults)
+async_circuit_data = async_list_view(views.getCircuitData)
+async_race_data = async_list_view(views.getRaceData)
+async_constructor_data = async_list_view(views.getConstructorData)
+async_specific_results = async_list_view(views.getSpecificResults)
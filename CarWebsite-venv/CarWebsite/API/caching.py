@@ -0,0 +1,71 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from Formula1.cache import dataset_version
+
+STATS_KEY = "API:cache_stats:{}:{}"
+
+
+def cache_timeouts():
+    # ? per-scope TTLs live next to the throttle rates in REST_FRAMEWORK["RESPONSE_CACHE_TIMEOUTS"]
+    return getattr(settings, "REST_FRAMEWORK", {}).get("RESPONSE_CACHE_TIMEOUTS", {})
+
+
+def count(scope, outcome):
+    key = STATS_KEY.format(scope, outcome)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def cache_stats():
+    """hits, misses and hit rate of every configured scope"""
+    scopes = list(cache_timeouts())
+    found = cache.get_many([STATS_KEY.format(i, j) for i in scopes for j in ("hit", "miss")])
+    stats = {}
+    for scope in scopes:
+        hits = found.get(STATS_KEY.format(scope, "hit"), 0)
+        misses = found.get(STATS_KEY.format(scope, "miss"), 0)
+        stats[scope] = {"hits":hits, "misses":misses, "hit_rate":round(hits / (hits + misses), 3) if hits + misses else None}
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    keeps the serialized data of GET responses for the TTL configured for `cache_scope`.
+    The key includes the view's data versions, so a cached response is never older than the data behind it
+    """
+    cache_scope = None
+
+    def get_cache_key(self, request):
+        if hasattr(self, "get_versions"):
+            versions = self.get_versions(request, **self.kwargs)
+        else:
+            versions = [dataset_version()]
+        parts = [request.get_host(), request.get_full_path(), *map(str, versions)]
+        return f"API:response:{self.cache_scope}:{hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()}"
+
+    def get(self, request, *args, **kwargs):
+        timeout = cache_timeouts().get(self.cache_scope)
+        if not timeout:
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            count(self.cache_scope, "hit")
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        # ? streamed listings are not Response objects and are never cached or counted
+        if isinstance(response, Response):
+            count(self.cache_scope, "miss")
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout)
+                response["X-Cache"] = "MISS"
+        return response
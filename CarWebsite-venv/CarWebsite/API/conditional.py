@@ -0,0 +1,92 @@
+import hashlib
+from calendar import timegm
+from datetime import datetime, timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from Formula1.cache import table_versions
+
+
+class NotModified(Exception):
+    """carries the 304 (or 412) out of `initial()`, DRF hands it back from `handle_exception()`"""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    answers If-None-Match / If-Modified-Since from the table versions alone, before any query or serialization.
+    The check runs after authentication, permissions and throttles, so a 304 is counted like any other request
+    """
+    # ? (table, season) pairs, or plain table names, whose changes invalidate this view
+    version_tables = ()
+    etag = None
+    last_modified = None
+
+    def get_version_keys(self, request, *args, **kwargs):
+        return [(i,) if isinstance(i, str) else i for i in self.version_tables]
+
+    def get_expanded_tables(self, request):
+        """tables of the relations nested with ?expand=, their rows are part of the response too"""
+        serializer_class = self.get_serializer_class() if hasattr(self, "get_serializer_class") else None
+        expandable = getattr(serializer_class, "expandable", {})
+        names = [i.strip() for i in request.GET.get("expand", "").split(",")]
+        return [expandable[i][1].model_serializer.Meta.model._meta.model_name for i in names if i in expandable]
+
+    def get_versions(self, request, *args, **kwargs):
+        # ? the etag and last-modified are asked for separately, both come from one cache lookup
+        if not hasattr(request, "_f1_versions"):
+            keys = self.get_version_keys(request, *args, **kwargs)
+            keys += [(i,) for i in self.get_expanded_tables(request) if (i,) not in keys]
+            request._f1_versions = table_versions(*keys)
+        return request._f1_versions
+
+    def get_etag(self, request, *args, **kwargs):
+        versions = self.get_versions(request, *args, **kwargs)
+        if not versions:
+            return None
+        parts = [request.get_full_path(), request.META.get("HTTP_ACCEPT", ""), *map(str, versions)]
+        return hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get_last_modified(self, request, *args, **kwargs):
+        versions = self.get_versions(request, *args, **kwargs)
+        if not versions:
+            return None
+        return datetime.fromtimestamp(max(versions), tz=timezone.utc)
+
+    def conditional_response(self, request, *args, **kwargs):
+        """the 304 (or 412) for this request's validators, None when the view has to answer"""
+        etag = self.get_etag(request, *args, **kwargs)
+        last_modified = self.get_last_modified(request, *args, **kwargs)
+        self.etag = quote_etag(etag) if etag else None
+        self.last_modified = timegm(last_modified.utctimetuple()) if last_modified else None
+        return get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+
+    def patch_conditional_headers(self, response):
+        if self.etag and not response.has_header("ETag"):
+            response["ETag"] = self.etag
+        if self.last_modified and not response.has_header("Last-Modified"):
+            response["Last-Modified"] = http_date(self.last_modified)
+        # ? clients may keep the body but must revalidate, which costs a 304 when nothing changed
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in ("GET", "HEAD"):
+            response = self.conditional_response(request, *args, **kwargs)
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ("GET", "HEAD"):
+            self.patch_conditional_headers(response)
+        return response
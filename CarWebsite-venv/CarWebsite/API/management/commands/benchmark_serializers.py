@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from API.renderers import FastJSONRenderer
+from API.serializer import *
+
+BENCHMARKS = {
+    "results": (results, f1ResultsSerializer, f1ResultsValuesSerializer),
+    "races": (races, f1RacesSerializer, f1RacesValuesSerializer),
+    "drivers": (drivers, f1DriverSerializer, f1DriverValuesSerializer),
+}
+
+
+class Command(BaseCommand):
+    help = "compares rows per second of the ModelSerializer + JSONRenderer path against the values() + orjson path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=BENCHMARKS.keys(), default="results")
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def _best(self, repeat, func):
+        best, output = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    def handle(self, *args, **options):
+        model, model_serializer, values_serializer = BENCHMARKS[options["model"]]
+        queryset = model.objects.order_by("pk")[:options["rows"]]
+        rows = queryset.count()
+        if not rows:
+            raise CommandError(f"no {options['model']} rows to benchmark")
+
+        drf_time, drf_output = self._best(options["repeat"], lambda: JSONRenderer().render(
+            model_serializer(queryset.all(), many=True).data))
+        fast_time, fast_output = self._best(options["repeat"], lambda: FastJSONRenderer().render(
+            values_serializer(queryset.all(), many=True).data))
+
+        if JSONRenderer().render(values_serializer(queryset.all(), many=True).data) != drf_output:
+            raise CommandError("values serializer output differs from the ModelSerializer output")
+
+        self.stdout.write(f"{options['model']}: {rows} rows, best of {options['repeat']}")
+        self.stdout.write(f"  ModelSerializer + JSONRenderer : {rows / drf_time:12,.0f} rows/s ({drf_time * 1000:.1f} ms)")
+        self.stdout.write(f"  values() + FastJSONRenderer    : {rows / fast_time:12,.0f} rows/s ({fast_time * 1000:.1f} ms)")
+        self.stdout.write(f"  speedup                        : {drf_time / fast_time:.1f}x, {len(fast_output)} bytes")
@@ -0,0 +1,55 @@
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "fires concurrent GET requests at running API urls and reports throughput and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="full urls, requests go round robin over them")
+        parser.add_argument("--clients", type=int, default=50, help="concurrent clients, each with its own connection")
+        parser.add_argument("--requests", type=int, default=2000, help="total number of requests")
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        clients, total = options["clients"], options["requests"]
+        if clients < 1 or total < 1:
+            raise CommandError("--clients and --requests have to be positive")
+
+        urls = options["urls"]
+        local = threading.local()
+        latencies = []
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def fire(index):
+            # ? one keep-alive session per client thread, like real pollers
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            started = time.perf_counter()
+            try:
+                status = local.session.get(urls[index % len(urls)], timeout=options["timeout"]).status_code
+            except requests.RequestException as error:
+                status = type(error).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(fire, range(total)))
+        duration = time.perf_counter() - started
+
+        latencies.sort()
+        self.stdout.write(f"{total} requests, {clients} clients, {duration:.2f}s")
+        self.stdout.write(f"  throughput : {total / duration:,.1f} req/s")
+        self.stdout.write(f"  latency    : p50 {statistics.median(latencies) * 1000:.1f} ms, "
+                          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms, "
+                          f"max {latencies[-1] * 1000:.1f} ms")
+        self.stdout.write(f"  statuses   : {', '.join(f'{i}: {j}' for i, j in sorted(statuses.items(), key=str))}")
@@ -0,0 +1,65 @@
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import CursorPagination
+
+
+class F1CursorPagination(CursorPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "pk"
+
+
+def json_chunk(serializer_class, chunk, first, plan=None):
+    # ? the elements of a JSON array without its brackets, so chunks can be concatenated into one array
+    return ("" if first else ",") + json.dumps(serializer_class.to_rows(chunk, plan), cls=DjangoJSONEncoder)[1:-1]
+
+
+def stream_json(queryset, serializer_class, chunk_size=2000, plan=None):
+    """streams the rows of `queryset` as a JSON array, read through a server-side cursor chunk by chunk"""
+    fields = plan[0] if plan else [i[0] for i in serializer_class.compiled()]
+
+    def rows():
+        yield "["
+        first = True
+        chunk = []
+        for row in serializer_class.annotated(queryset).values_list(*fields).iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield json_chunk(serializer_class, chunk, first, plan)
+                first = False
+                chunk = []
+        if chunk:
+            yield json_chunk(serializer_class, chunk, first, plan)
+        yield "]"
+
+    return StreamingHttpResponse(rows(), content_type="application/json")
+
+
+class FullListingMixin:
+    # ? the ".../all" routes are cursor paginated, or streamed with ?stream=1; the filtered routes stay unpaginated
+    pagination_class = F1CursorPagination
+    stream_query_param = "stream"
+
+    def is_full_listing(self):
+        return self.request.path.endswith("/all")
+
+    @property
+    def filters_required(self):
+        return not self.is_full_listing()
+
+    @property
+    def paginator(self):
+        if not self.is_full_listing():
+            return None
+        return super().paginator
+
+    def wants_stream(self):
+        return self.is_full_listing() and self.request.query_params.get(self.stream_query_param) in ("1", "true")
+
+    def list(self, request, *args, **kwargs):
+        if self.wants_stream():
+            return stream_json(self.filter_queryset(self.get_queryset()).order_by("pk"), self.get_serializer_class(),
+                               plan=self.get_serializer().selected_plan())
+        return super().list(request, *args, **kwargs)
@@ -1,4 +1,6 @@
+from django.db.models import QuerySet, F
 from rest_framework.serializers import ModelSerializer
+from rest_framework.exceptions import ValidationError
 from Formula1.models import *
 
 class formula1Serializer(ModelSerializer):
@@ -29,4 +31,176 @@ class f1ResultsSerializer(ModelSerializer):
 class f1ConstructorsSerializer(ModelSerializer):
     class Meta:
         model = constructors
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+
+
+class ValuesSerializer:
+    """
+    same output as `model_serializer` but built from values_list() tuples, with one converter per field
+    compiled once per class. Plain int/str/float/FK columns are copied as is, everything else goes
+    through the matching DRF field's to_representation so the output stays identical.
+    """
+    model_serializer = None
+    passthrough = (models.AutoField, models.BigAutoField, models.IntegerField, models.SmallIntegerField,
+                   models.PositiveIntegerField, models.PositiveSmallIntegerField, models.BigIntegerField,
+                   models.CharField, models.TextField, models.FloatField, models.BooleanField, models.ForeignKey)
+    # ? ?expand= name -> (foreign key, values serializer of the related model)
+    expandable = {}
+    # ? extra output name -> expression annotated onto the queryset and read in the same values_list()
+    annotations = {}
+    _compiled = None
+
+    def __init__(self, instance=None, many=False, **kwargs):
+        self.instance = instance
+        self.many = many
+        request = kwargs.get("context", {}).get("request")
+        self.fields, self.expand = self.parse_selection(request.query_params if request is not None else {})
+
+    @classmethod
+    def parse_selection(cls, params):
+        """the ?fields= and ?expand= lists of a request, None and () when not given"""
+        names = [i[0] for i in cls.compiled()]
+        errors = {}
+        fields = [i.strip() for i in params.get("fields", "").split(",") if i.strip()] or None
+        if fields and set(fields) - set(names):
+            errors["fields"] = f"unknown fields {', '.join(sorted(set(fields) - set(names)))}, use any of: {', '.join(names)}"
+        expand = tuple(dict.fromkeys(i.strip() for i in params.get("expand", "").split(",") if i.strip()))
+        if set(expand) - set(cls.expandable):
+            errors["expand"] = f"can't expand {', '.join(sorted(set(expand) - set(cls.expandable)))}, use any of: {', '.join(cls.expandable) or 'nothing'}"
+        if errors:
+            raise ValidationError(errors)
+        return fields, expand
+
+    @classmethod
+    def plan(cls, fields=None, expand=()):
+        """
+        values_list() paths, converters and output layout for a sparse and/or expanded payload.
+        Expanded objects are read through the foreign key's join in the same query
+        """
+        columns = [i for i in cls.compiled() if not fields or i[0] in fields]
+        paths = [i[0] for i in columns]
+        converters = [i[2] for i in columns]
+        layout = [(i[0], index) for index, i in enumerate(columns)]
+        for name in expand:
+            foreign_key, related = cls.expandable[name]
+            nested = []
+            for related_name, _, convert in related.compiled():
+                nested.append((related_name, len(paths)))
+                paths.append(f"{foreign_key}__{related_name}")
+                converters.append(convert)
+            layout.append((name, nested))
+        return paths, converters, layout
+
+    @classmethod
+    def annotated(cls, queryset):
+        return queryset.annotate(**cls.annotations) if cls.annotations else queryset
+
+    def selected_plan(self):
+        if self.fields is None and not self.expand:
+            return None
+        return self.plan(self.fields, self.expand)
+
+    @classmethod
+    def compiled(cls):
+        if cls.__dict__.get("_compiled") is None:
+            model = cls.model_serializer.Meta.model
+            drf_fields = cls.model_serializer().fields
+            compiled = []
+            # ? DRF's own field order (pk, plain fields, then relations) so the rendered bytes match too
+            for name, drf_field in drf_fields.items():
+                field = model._meta.get_field(name)
+                convert = None if isinstance(field, cls.passthrough) else drf_field.to_representation
+                compiled.append((name, field.attname, convert))
+            # ? annotations go right after the pk, where DRF puts declared fields
+            compiled[1:1] = [(name, name, None) for name in cls.annotations]
+            cls._compiled = compiled
+        return cls._compiled
+
+    @classmethod
+    def to_rows(cls, rows, plan=None):
+        if plan is not None:
+            return cls.planned_rows(rows, plan)
+        compiled = cls.compiled()
+        names = [i[0] for i in compiled]
+        converters = [(index, i[2]) for index, i in enumerate(compiled) if i[2] is not None]
+        data = []
+        for row in rows:
+            if converters:
+                row = list(row)
+                for index, convert in converters:
+                    if row[index] is not None:
+                        row[index] = convert(row[index])
+            data.append(dict(zip(names, row)))
+        return data
+
+    @classmethod
+    def planned_rows(cls, rows, plan):
+        paths, converters, layout = plan
+        converters = [(index, i) for index, i in enumerate(converters) if i is not None]
+        data = []
+        for row in rows:
+            if converters:
+                row = list(row)
+                for index, convert in converters:
+                    if row[index] is not None:
+                        row[index] = convert(row[index])
+            item = {}
+            for name, position in layout:
+                item[name] = {i: row[j] for i, j in position} if isinstance(position, list) else row[position]
+            data.append(item)
+        return data
+
+    @property
+    def data(self):
+        plan = self.selected_plan()
+        if plan is None:
+            compiled = self.compiled()
+            if isinstance(self.instance, QuerySet):
+                return self.to_rows(self.annotated(self.instance).values_list(*[i[0] for i in compiled]))
+            objects = self.instance if self.many else [self.instance]
+            data = self.to_rows([getattr(obj, i[1]) for i in compiled] for obj in objects)
+            return data if self.many else data[0]
+
+        if isinstance(self.instance, QuerySet):
+            return self.to_rows(self.annotated(self.instance).values_list(*plan[0]), plan)
+        # ? model instances (a cursor page) are read again as one joined values_list(), in page order
+        objects = self.instance if self.many else [self.instance]
+        model = self.model_serializer.Meta.model
+        queryset = self.annotated(model.objects.filter(pk__in=[obj.pk for obj in objects]))
+        rows = {i[0]: i[1:] for i in queryset.values_list("pk", *plan[0])}
+        data = self.to_rows([rows[obj.pk] for obj in objects], plan)
+        return data if self.many else data[0]
+
+class formula1ValuesSerializer(ValuesSerializer):
+    model_serializer = formula1Serializer
+
+class f1DriverValuesSerializer(ValuesSerializer):
+    model_serializer = f1DriverSerializer
+
+class f1CircuitsValuesSerializer(ValuesSerializer):
+    model_serializer = f1CircuitsSerializer
+
+class f1RacesValuesSerializer(ValuesSerializer):
+    model_serializer = f1RacesSerializer
+    expandable = {"circuit": ("circuit_id", f1CircuitsValuesSerializer)}
+
+class f1ConstructorsValuesSerializer(ValuesSerializer):
+    model_serializer = f1ConstructorsSerializer
+
+class f1ResultsValuesSerializer(ValuesSerializer):
+    model_serializer = f1ResultsSerializer
+    expandable = {
+        "driver": ("driver_id", f1DriverValuesSerializer),
+        "race": ("race_id", f1RacesValuesSerializer),
+        "constructor": ("constructor_id", f1ConstructorsValuesSerializer),
+    }
+
+class f1BatchResultsValuesSerializer(f1ResultsValuesSerializer):
+    # ? read through the race and constructor joins, so grouped results need no follow-up requests
+    annotations = {
+        "year": F("race_id__year"),
+        "round": F("race_id__round"),
+        "race_name": F("race_id__name"),
+        "constructor_name": F("constructor_id__name"),
+    }
@@ -1,3 +1,186 @@
-from django.test import TestCase
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from Formula1.models import circuits, constructors
+from Formula1.tests import F1DataMixin
 
-# Create your tests here.
+
+class FilterTests(F1DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.season = cls.make_season(rounds=3)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_declared_filters_are_applied(self):
+        response = self.client.get("/api/F1/races", {"year": 2021, "round__in": "1,3"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([i["round"] for i in response.json()], [1, 3])
+
+        response = self.client.get("/api/F1/races", {"round__range": "2,3", "name__prefix": "grand"})
+        self.assertEqual([i["round"] for i in response.json()], [2, 3])
+
+    def test_invalid_filters_are_rejected(self):
+        for params, field in (({"colour": "red"}, "colour"),
+                              ({"year__search": "2021"}, "year__search"),
+                              ({"year": "twenty"}, "year"),
+                              ({"round__range": "1"}, "round__range"),
+                              ({"round__in": ",".join(map(str, range(101)))}, "round__in"),
+                              ({"date": "2021-13-01"}, "date")):
+            response = self.client.get("/api/F1/races", params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(field, response.json())
+
+        response = self.client.get("/api/F1/results", {"year": 2021, "status": "Crashed"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.json())
+
+    def test_a_bare_request_does_not_list_the_table(self):
+        self.make_driver("Lando", "Norris", 4)
+        self.assertEqual(self.client.get("/api/F1/drivers").json(), [])
+        self.assertEqual(self.client.get("/api/F1/races").json(), [])
+        self.assertEqual(len(self.client.get("/api/F1/drivers", {"nationality": "British"}).json()), 1)
+
+
+class ConditionalGetTests(F1DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.season = cls.make_season(rounds=1)
+        cls.team = constructors.objects.create(ref_name="mclaren", name="McLaren", nationality="British")
+        cls.driver = cls.make_driver("Lando", "Norris", 4)
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        return response
+
+    def test_a_write_invalidates_the_etag(self):
+        first = self.revalidate("/api/F1/circuits", {"country": "Italy"})
+        with self.captureOnCommitCallbacks(execute=True):
+            circuits.objects.create(ref_name="imola", name="Imola", location="Imola", country="Italy")
+
+        response = self.client.get("/api/F1/circuits", {"country": "Italy"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(sorted(i["ref_name"] for i in response.json()), ["imola", "monza"])
+
+    def test_a_result_invalidates_its_season(self):
+        first = self.revalidate("/api/F1/results", {"year": 2021})
+        self.assertEqual(first.json(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_result(self.season[0], self.driver, self.team, 1, 25)
+
+        response = self.client.get("/api/F1/results", {"year": 2021}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_batch_results_follow_the_constructor_name(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_result(self.season[0], self.driver, self.team, 1, 25)
+        params = {"ids": f"{self.driver.pk},0", "year": 2021}
+        first = self.revalidate("/api/F1/drivers/results", params)
+        self.assertEqual(first.json()["0"], [])
+        self.assertEqual(first.json()[str(self.driver.pk)][0]["constructor_name"], "McLaren")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            constructors.objects.filter(pk=self.team.pk).update(name="McLaren F1 Team")
+            constructors.objects.get(pk=self.team.pk).save()
+        response = self.client.get("/api/F1/drivers/results", params, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[str(self.driver.pk)][0]["constructor_name"], "McLaren F1 Team")
+
+
+    def test_expanded_relations_invalidate_the_etag(self):
+        params = {"year": 2021, "expand": "circuit"}
+        first = self.revalidate("/api/F1/races", params)
+        self.assertEqual(first.json()[0]["circuit"]["name"], "Monza")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            circuits.objects.filter(pk=self.season[0].circuit_id_id).update(name="Autodromo Nazionale Monza")
+            circuits.objects.get(pk=self.season[0].circuit_id_id).save()
+        response = self.client.get("/api/F1/races", params, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["circuit"]["name"], "Autodromo Nazionale Monza")
+        # ? without the expansion the races alone haven't changed
+        plain = self.revalidate("/api/F1/races", {"year": 2021})
+        self.assertNotIn("circuit", plain.json()[0])
+
+
+class AsyncViewTests(F1DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.make_season(rounds=3)
+
+    def setUp(self):
+        cache.clear()
+
+    def rows(self, response):
+        # ? cursor pages link to their own route, only the rows are the same
+        data = response.json()
+        return data["results"] if isinstance(data, dict) else data
+
+    def test_async_views_use_the_response_cache(self):
+        for path, params in (("F1/races", {"year": 2021}), ("F1/races/all", {"page_size": 2})):
+            url, async_url = f"/api/{path}", f"/api/async/{path}"
+            expected = self.client.get(url, params)
+            self.assertEqual(expected["X-Cache"], "MISS")
+            cache.clear()
+
+            first = self.client.get(async_url, params)
+            self.assertEqual((first.status_code, first["X-Cache"]), (200, "MISS"))
+            self.assertEqual(self.rows(first), self.rows(expected))
+            second = self.client.get(async_url, params)
+            self.assertEqual(second["X-Cache"], "HIT")
+            self.assertEqual(second.json(), first.json())
+
+
+class ExportTests(F1DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.make_season(year=2020, rounds=2)
+        cls.make_driver("Lando", "Norris", 4)
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(F1_EXPORT_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def download(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_only_whole_tables_are_snapshotted(self):
+        for season in range(2000, 2010):
+            self.assertEqual(len(self.download("/api/F1/export/races.csv", {"season": season}).splitlines()), 1)
+        self.assertEqual(len(self.download("/api/F1/export/races.csv", {"season": "2020"}).splitlines()), 3)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+        whole = self.download("/api/F1/export/races.csv")
+        self.assertEqual(len(whole.splitlines()), 3)
+        self.assertEqual(len(list(self.directory.iterdir())), 1)
+        self.assertEqual(self.download("/api/F1/export/races.csv"), whole)
+        self.assertEqual(len(list(self.directory.iterdir())), 1)
+
+    def test_revalidations_count_against_the_throttle(self):
+        allowed = int(settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]["exports"].split("/")[0])
+        first = self.client.get("/api/F1/export/races.csv", {"season": 2020})
+        b"".join(first.streaming_content)
+        statuses = [self.client.get("/api/F1/export/races.csv", {"season": 2020}, HTTP_IF_NONE_MATCH=first["ETag"]).status_code
+                    for _ in range(allowed)]
+        self.assertEqual(statuses, [304] * (allowed - 1) + [429])
@@ -1,11 +1,12 @@
 from django.urls import path, re_path
-from . import views
+from . import views, async_views
 
 app_name = "API"
 urlpatterns = [
     path("F1", views.getF1Data.as_view(), name="main"),
     path("F1/drivers", views.getDriverData.as_view(), name="all_driver"),
     path("F1/driver/<int:id>/results", views.getDriverResults.as_view(), name="driver_results"),
+    path("F1/drivers/results", views.getBatchDriverResults.as_view(), name="batch_driver_results"),
     path("F1/circuits", views.getCircuitData.as_view(), name="circuits"),
     path("F1/circuits/all", views.getCircuitData.as_view(), name="all_circuit_data"),
     path("F1/races", views.getRaceData.as_view(), name="races"),
@@ -13,4 +14,17 @@ urlpatterns = [
     path("F1/constructors", views.getConstructorData.as_view(), name="constructor"),
     path("F1/constructors/all", views.getConstructorData.as_view(), name="all_constructors"),
     path("F1/results", views.getSpecificResults.as_view(), name="specific_result"),
+    path("F1/season/<int:year>/matrix", views.getSeasonMatrix.as_view(), name="season_matrix"),
+    # ? async twins of the read endpoints, worth using when the site runs under an ASGI server (see API/README.md)
+    path("async/F1/drivers", async_views.async_driver_data, name="async_all_driver"),
+    path("async/F1/driver/<int:id>/results", async_views.async_driver_results, name="async_driver_results"),
+    path("async/F1/circuits", async_views.async_circuit_data, name="async_circuits"),
+    path("async/F1/circuits/all", async_views.async_circuit_data, name="async_all_circuit_data"),
+    path("async/F1/races", async_views.async_race_data, name="async_races"),
+    path("async/F1/races/all", async_views.async_race_data, name="async_all_races_data"),
+    path("async/F1/constructors", async_views.async_constructor_data, name="async_constructor"),
+    path("async/F1/constructors/all", async_views.async_constructor_data, name="async_all_constructors"),
+    path("async/F1/results", async_views.async_specific_results, name="async_specific_result"),
+    path("cache-stats", views.getCacheStats.as_view(), name="cache_stats"),
+    path("F1/export/<str:table>.<str:file_format>", views.getTableExport.as_view(), name="table_export"),
 ]
@@ -1,139 +1,250 @@
 from rest_framework import viewsets
 from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser
+from rest_framework.exceptions import ValidationError, NotFound
+from django.http import StreamingHttpResponse, FileResponse
 from rest_framework.response import Response
 from .serializer import *
+from .pagination import FullListingMixin
+from .conditional import ConditionalGetMixin
+from .caching import CachedResponseMixin, cache_stats
+from .filters import FilterField, parse_date
 from Formula1.models import *
+from Formula1.search import search_drivers, search_constructors
+from Formula1.matrix import season_matrix, matrix_version_keys
+from Formula1.exports import EXPORT_TABLES, EXPORT_FORMATS, ExportError, export_filename, iter_csv, parquet_file
 # Create your views here.
 
-class getF1Data(ListAPIView):
-    serializer_class = formula1Serializer
+class getF1Data(CachedResponseMixin, ConditionalGetMixin, ListAPIView):
+    serializer_class = formula1ValuesSerializer
+    version_tables = ("formula1data",)
+    cache_scope = "f1_data"
+    filter_fields = {
+        "year": FilterField("year", int, ("exact", "in", "range")),
+        "date": FilterField("date", parse_date, ("exact", "range")),
+        "continent": FilterField("continent", str, ("exact", "search")),
+        "grand_prix": FilterField("grand_prix", str, ("search", "exact", "prefix")),
+        "circuit": FilterField("circuit", str, ("search", "exact", "prefix")),
+        "team": FilterField("team", str, ("search", "exact", "prefix")),
+        "winner": FilterField("winner_last_name", str, ("search", "exact", "prefix")),
+    }
 
     def get_queryset(self):
-        data = {}
-        for i,j in self.request.query_params.dict().items():
-            data[i+"__icontains"] = j
-        query_set = Formula1Data.objects.filter(**data)
-        return query_set
+        return Formula1Data.objects.all()
     
 
 
-class getDriverData(ListAPIView):
-    serializer_class = f1DriverSerializer
-    
+class getDriverData(CachedResponseMixin, ConditionalGetMixin, ListAPIView):
+    serializer_class = f1DriverValuesSerializer
+    version_tables = ("drivers",)
+    cache_scope = "drivers"
+    filter_ignore = ("search", "name")
+    filter_fields = {
+        "number": FilterField("number", int, ("exact", "in")),
+        "code": FilterField("code", str.upper, ("exact", "in")),
+        "nationality": FilterField("nationality", str, ("search", "exact", "prefix")),
+    }
+
+    def search_query(self):
+        parameters = self.request.query_params
+        return parameters.get("search", "") or parameters.get("name", "")
+
+    @property
+    def filters_required(self):
+        # ? a name search on its own is enough, only a bare request would dump the whole table
+        return not self.search_query()
+
     def get_queryset(self):
-        data = {}
-        parameters = self.request.query_params.dict().keys()
-        if "name" in parameters or "nationality" in parameters or "number" in parameters:
-            for i,j in self.request.query_params.dict().items():
-                if i == "number":
-                    data[i] = j
-                else:
-                    data[i+"__icontains"] = j
-            query_set = drivers.objects.filter(**data)
-        else:
-            query_set = []
+        query_set = drivers.objects.all()
+        search = self.search_query()
+        if search:
+            query_set = search_drivers(query_set, search)
         return query_set
 
 
 
-class getDriverResults(ListAPIView):
-    serializer_class = f1ResultsSerializer
+class getDriverResults(CachedResponseMixin, ConditionalGetMixin, ListAPIView):
+    serializer_class = f1ResultsValuesSerializer
+    version_tables = ("results",)
+    cache_scope = "results"
+    throttle_scope = "results"
+    filter_fields = {
+        "grid": FilterField("starting_grid_position", int, ("exact", "in", "range")),
+        "year": FilterField("race_id__year", int, ("exact", "in", "range")),
+        "constructor": FilterField("constructor_id", int, ("exact", "in")),
+        "status": FilterField("status", str, ("exact", "in"), choices=results.StatusChoices.values),
+    }
 
     def get_queryset(self):
-        parameters = self.request.query_params.dict().keys()
-        id = self.kwargs["id"]
-        if parameters == []:
-            query_set = results.objects.select_related("driver_id").filter(driver_id=id).order_by("final_position")
-            
-        
-        elif "grid" in parameters:
-            value = self.request.query_params.dict()["grid"]
-            query_set = results.objects.select_related("driver_id").filter(driver_id=id, starting_grid_position=value).order_by("final_position")
-        
-        return query_set
+        return results.objects.filter(driver_id=self.kwargs["id"]).order_by("final_position")
     
 
 
-class getCircuitData(ListAPIView):
-    serializer_class = f1CircuitsSerializer
+class getCircuitData(CachedResponseMixin, ConditionalGetMixin, FullListingMixin, ListAPIView):
+    serializer_class = f1CircuitsValuesSerializer
+    version_tables = ("circuits",)
+    cache_scope = "circuits"
+    filter_fields = {
+        "name": FilterField("ref_name", str, ("search", "exact", "prefix")),
+        "location": FilterField("location", str, ("search", "exact", "prefix")),
+        "country": FilterField("country", str, ("search", "exact", "in")),
+    }
 
     def get_queryset(self):
-        flag = False
-        data = {}
-        if self.request.path != "/api/F1/circuits/all":
-            parameters = self.request.query_params.dict().keys()
-            if "name" in parameters or "location" in parameters or "country" in parameters:
-                
-                if "name" in parameters and self.request.query_params.dict()["name"]:
-                    query_set = circuits.objects.filter(ref_name__icontains=self.request.query_params.dict()["name"])
-                    if query_set:
-                        flag = True
-                        return query_set
-                if not flag:
-                    for i,j in self.request.qury_params.dict().items():
-                        data[i+"__icontains"] = j
-
-                query_set = circuits.objects.filter(**data)
-            else:
-                query_set = []
-        
-        else:
-            query_set = circuits.objects.all()
-
-        return query_set
+        return circuits.objects.all().order_by("circuit_id")
     
 
 
-class getRaceData(ListAPIView):
-    serializer_class = f1RacesSerializer
+class getRaceData(CachedResponseMixin, ConditionalGetMixin, FullListingMixin, ListAPIView):
+    serializer_class = f1RacesValuesSerializer
+    version_tables = ("races",)
+    cache_scope = "races"
+    filter_fields = {
+        "year": FilterField("year", int, ("exact", "in", "range")),
+        "round": FilterField("round", int, ("exact", "in", "range")),
+        "name": FilterField("name", str, ("search", "exact", "prefix")),
+        "date": FilterField("race_date", parse_date, ("exact", "range")),
+        "circuit": FilterField("circuit_id", int, ("exact", "in")),
+    }
 
     def get_queryset(self):
-        data = {}
-        if self.request.path != "/api/F1/races/all":
-            parameters = self.request.query_params.dict().keys()
-            if "name" in parameters or "date" in parameters or "year" in parameters:
-                for i,j in self.request.query_params.dict().items():
-                    data[i+"__icontains"] = j
-                query_set = races.objects.filter(**data)
-            else:
-                query_set = []
-        
-        else:
-            query_set = races.objects.all()
-        return query_set
+        return races.objects.all().order_by("race_id")
 
 
 
-class getConstructorData(ListAPIView):
-    serializer_class = f1ConstructorsSerializer
+class getConstructorData(CachedResponseMixin, ConditionalGetMixin, ListAPIView):
+    serializer_class = f1ConstructorsValuesSerializer
+    version_tables = ("constructors",)
+    cache_scope = "constructors"
+    filter_ignore = ("search", "name")
+    filter_fields = {
+        "nationality": FilterField("nationality", str, ("search", "exact", "prefix")),
+    }
 
-    def get_queryset(self):
-        if self.request.path != "/api/F1/constructors/all":
-            if "nationality" in self.request.query_params.dict().keys():
-                value = self.request.query_params.dict()["nationality"]
-                query_set = constructors.objects.filter(nationality__icontains=value)
-        else:
-            query_set = constructors.objects.all()
+    def search_query(self):
+        parameters = self.request.query_params
+        return parameters.get("search", "") or parameters.get("name", "")
+
+    @property
+    def filters_required(self):
+        return not self.request.path.endswith("/all") and not self.search_query()
 
+    def get_queryset(self):
+        query_set = constructors.objects.all()
+        search = self.search_query()
+        if search:
+            query_set = search_constructors(query_set, search)
         return query_set
 
 
 
-class getSpecificResults(ListAPIView):
-    serializer_class = f1ResultsSerializer
+class SeasonResultsVersionMixin(ConditionalGetMixin):
+    version_tables = ("results", "races", "drivers", "constructors")
+
+    def get_version_keys(self, request, *args, **kwargs):
+        # ? a single season only goes stale when that season's results change
+        year = request.GET.get("year", "")
+        if year.isdigit():
+            return [("results", int(year)), ("races",), ("drivers",), ("constructors",)]
+        return super().get_version_keys(request, *args, **kwargs)
+
+
+
+class getSpecificResults(CachedResponseMixin, SeasonResultsVersionMixin, ListAPIView):
+    serializer_class = f1ResultsValuesSerializer
+    cache_scope = "results"
+    throttle_scope = "results"
+    filters_required = True
+    filter_fields = {
+        "driver_id": FilterField("driver_id", int, ("exact", "in")),
+        "name": FilterField("driver_id__ref_name", str, ("search", "exact", "prefix")),
+        "year": FilterField("race_id__year", int, ("exact", "in", "range")),
+        "round": FilterField("race_id__round", int, ("exact", "in", "range")),
+        "race_id": FilterField("race_id", int, ("exact", "in")),
+        "grid": FilterField("starting_grid_position", int, ("exact", "in", "range")),
+        "status": FilterField("status", str, ("exact", "in"), choices=results.StatusChoices.values),
+    }
+
+    def get_queryset(self):
+        return results.objects.all().order_by("race_id", "final_position")
+
+
+
+class getBatchDriverResults(CachedResponseMixin, SeasonResultsVersionMixin, ListAPIView):
+    """results of several drivers in one query, grouped by driver id"""
+    serializer_class = f1BatchResultsValuesSerializer
+    cache_scope = "batch_results"
+    throttle_scope = "results"
+    filters_required = True
+    filter_fields = {
+        "ids": FilterField("driver_id", int, ("in",)),
+        "year": FilterField("race_id__year", int, ("exact", "in", "range")),
+    }
 
     def get_queryset(self):
-        parameters = self.request.query_params.dict().keys()
-        if "driver_id" in parameters and "year" in parameters:
-            d_id = self.request.query_params.dict()['driver_id']
-            year_data = self.request.query_params.dict()['year']
-            query_set = results.objects.select_related("race_id").filter(driver_id=d_id, year=year_data)
-
-        elif "name" in parameters and "year" in parameters:
-            name = self.request.query_params.dict()['name']
-            driver = drivers.objects.filter(ref_name__icontains=name)
-            year_data = int(self.request.query_params.dict()['year'])
-            data = results.objects.select_related("race_id").filter(driver_id=driver[0].driver_id).order_by("final_position")
-            query_set = [i for i in data if i.race_id.year==year_data]
-            
-        return query_set
\ No newline at end of file
+        return results.objects.order_by("driver_id", "race_id__year", "race_id__round")
+
+    def list(self, request, *args, **kwargs):
+        ids = [i.strip() for i in request.query_params.get("ids", "").split(",") if i.strip()]
+        if not ids:
+            raise ValidationError({"ids": "comma separated driver ids are required"})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # ? every requested driver gets a key, an empty list means no results rather than a missing driver
+        grouped = {str(int(i)): [] for i in ids}
+        for row in self.get_serializer(queryset, many=True).data:
+            grouped.setdefault(str(row["driver_id"]), []).append(row)
+        return Response(grouped)
+
+
+
+
+class getSeasonMatrix(ConditionalGetMixin, APIView):
+    """positions and points of a whole season as columnar drivers x rounds arrays"""
+    throttle_scope = "results"
+
+    def get_version_keys(self, request, *args, **kwargs):
+        return matrix_version_keys(kwargs["year"])
+
+    def get(self, request, year):
+        return Response(season_matrix(year))
+
+
+
+
+class getTableExport(ConditionalGetMixin, APIView):
+    """whole Formula1 tables as csv or parquet files, optionally limited with ?season=2020,2021"""
+    version_tables = tuple(EXPORT_TABLES)
+    throttle_scope = "exports"
+
+    def get(self, request, table, file_format):
+        if table not in EXPORT_TABLES or file_format not in EXPORT_FORMATS:
+            raise NotFound(f"exports are {', '.join(EXPORT_TABLES)} as {' or '.join(EXPORT_FORMATS)}")
+        try:
+            seasons = [int(i) for i in request.query_params.get("season", "").split(",") if i.strip()]
+        except ValueError:
+            raise ValidationError({"season": "comma separated years expected"})
+
+        filename = export_filename(table, file_format, seasons)
+        if file_format == "csv":
+            response = StreamingHttpResponse(iter_csv(table, seasons), content_type="text/csv")
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+
+        try:
+            export = parquet_file(table, seasons)
+        except ExportError as error:
+            return Response({"detail": str(error)}, status=501)
+        return FileResponse(export, as_attachment=True, filename=filename,
+                            content_type="application/vnd.apache.parquet")
+
+
+
+
+class getCacheStats(APIView):
+    """response cache hits and misses per scope, for staff only"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
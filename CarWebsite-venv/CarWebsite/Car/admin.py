@@ -7,4 +7,15 @@ class submittingNewCarsAdmin(admin.ModelAdmin):
 
 @admin.register(GeneralInformation)
 class GeneralInformationAdmin(admin.ModelAdmin):
-    list_display = ["info"]
\ No newline at end of file
+    list_display = ["info"]
+
+@admin.register(manufacturerIdentifiers)
+class manufacturerIdentifiersAdmin(admin.ModelAdmin):
+    list_display = ["wmi", "manufacturer", "make", "country", "updated"]
+    search_fields = ["wmi", "manufacturer", "make"]
+
+@admin.register(modelCatalog)
+class modelCatalogAdmin(admin.ModelAdmin):
+    list_display = ["make", "model", "year", "vehicle_type", "synced"]
+    list_filter = ["vehicle_type"]
+    search_fields = ["make", "model"]
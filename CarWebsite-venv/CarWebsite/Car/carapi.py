@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .models import GeneralInformation
+
+logger = logging.getLogger(__name__)
+
+CARAPI_URL = "https://carapi.app/api/vehicle-attributes"
+CARAPI_TIMEOUT = (3.05, 15)
+# ? carapi attribute -> key in GeneralInformation.info
+ATTRIBUTES = {"bodies.type": "body_types", "engines.cylinders": "cylinders", "engines.drive_type": "drive_types",
+              "engines.engine_type": "engine_types", "engines.fuel_type": "fuel_types",
+              "engines.transmission": "transmission", "engines.valves": "valves"}
+LATENCY_KEY = "Car:carapi_latency:{}"
+
+_session = None
+_session_lock = threading.Lock()
+# ? the updater fetches every attribute in its own thread, their stats are read, changed and written under this lock
+_latency_lock = threading.Lock()
+
+
+def get_session():
+    # ? one keep-alive connection per attribute, reused by every run of the job
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(ATTRIBUTES), max_retries=retry)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def record_latency(attribute, seconds, status):
+    key = LATENCY_KEY.format(attribute)
+    with _latency_lock:
+        stats = cache.get(key) or {"count": 0, "total_ms": 0.0}
+        stats["count"] += 1
+        stats["total_ms"] += seconds * 1000
+        stats.update({"last_ms": round(seconds * 1000, 1), "avg_ms": round(stats["total_ms"] / stats["count"], 1), "status": status})
+        cache.set(key, stats, timeout=None)
+
+
+def fetch_latency_stats():
+    """last and average carapi fetch time of every attribute, in milliseconds"""
+    found = cache.get_many([LATENCY_KEY.format(i) for i in ATTRIBUTES])
+    return {i: found.get(LATENCY_KEY.format(i)) for i in ATTRIBUTES}
+
+
+def fetch_attribute(attribute, validators):
+    """
+    (status, data, validators) of one attribute. A 304 answer to the stored ETag / Last-Modified
+    comes back with data None, the stored values are still current
+    """
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    started = time.perf_counter()
+    try:
+        response = get_session().get(getattr(settings, "CARAPI_URL", CARAPI_URL), params={"attribute": attribute}, headers=headers,
+                                     timeout=getattr(settings, "CARAPI_TIMEOUT", CARAPI_TIMEOUT))
+    except requests.RequestException as error:
+        record_latency(attribute, time.perf_counter() - started, type(error).__name__)
+        raise
+    elapsed = time.perf_counter() - started
+    record_latency(attribute, elapsed, response.status_code)
+    logger.debug("carapi %s answered %s in %.1f ms", attribute, response.status_code, elapsed * 1000)
+
+    if response.status_code == 304:
+        return 304, None, validators
+    response.raise_for_status()
+    validators = {"etag": response.headers.get("ETag", ""), "last_modified": response.headers.get("Last-Modified", "")}
+    return response.status_code, response.json(), validators
+
+
+def GeneralInformation_Model_Updater():
+    """fetches every attribute at once and writes the single GeneralInformation row only when the payload changed"""
+    current = GeneralInformation.objects.filter(key="carapi").first()
+    old_info = current.info if current else {}
+    old_validators = current.validators if current else {}
+
+    def fetch(attribute):
+        # ? without the stored value a 304 would be useless, so only ask conditionally when there is one
+        validators = old_validators.get(attribute, {}) if ATTRIBUTES[attribute] in old_info else {}
+        return attribute, fetch_attribute(attribute, validators)
+
+    info, validators = {}, {}
+    try:
+        with ThreadPoolExecutor(max_workers=len(ATTRIBUTES)) as pool:
+            for attribute, (status, data, attribute_validators) in pool.map(fetch, ATTRIBUTES):
+                info[ATTRIBUTES[attribute]] = old_info[ATTRIBUTES[attribute]] if status == 304 else data
+                validators[attribute] = attribute_validators
+    except (requests.RequestException, ValueError) as error:
+        # ? a partial payload would replace good data, the next run tries again
+        logger.warning("update failed, keeping the stored information: %s", error)
+        return False
+
+    checksum = hashlib.sha256(json.dumps(info, sort_keys=True).encode("utf-8")).hexdigest()
+    if current and current.checksum == checksum:
+        if validators != old_validators:
+            GeneralInformation.objects.filter(pk=current.pk).update(validators=validators)
+        logger.info("information unchanged")
+        return False
+
+    GeneralInformation.objects.update_or_create(key="carapi", defaults={"info": info, "checksum": checksum, "validators": validators})
+    logger.info("update was successful")
+    return True
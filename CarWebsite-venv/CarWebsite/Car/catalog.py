@@ -0,0 +1,144 @@
+import bisect
+import difflib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from . import nhtsa
+from .forms import NHTSA_API_CarModelSearchForm
+from .models import modelCatalog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAKES = ("acura", "audi", "bmw", "buick", "cadillac", "chevrolet", "chrysler", "dodge", "ford", "gmc", "honda",
+                 "hyundai", "infiniti", "jeep", "kia", "lexus", "mazda", "mercedes-benz", "mitsubishi", "nissan",
+                 "porsche", "ram", "subaru", "tesla", "toyota", "volkswagen", "volvo")
+DEFAULT_YEARS = 15  # ? the last 15 model years plus next year's
+VEHICLE_TYPES = [i for i, _ in NHTSA_API_CarModelSearchForm.VehicelTypeChoices if i]
+VERSION_KEY = "car:catalog:version"
+
+_makes = []  # ? sorted (upper case name, name) pairs, bisected for prefixes
+_makes_version = None
+_makes_lock = threading.Lock()
+
+
+def catalog_years():
+    years = getattr(settings, "NHTSA_CATALOG_YEARS", None)
+    if years:
+        return list(years)
+    latest = timezone.now().year + 1
+    return list(range(latest - DEFAULT_YEARS, latest + 1))
+
+
+def make_index():
+    """every make of the catalog, reloaded whenever a sync changed it"""
+    global _makes, _makes_version
+    version = cache.get(VERSION_KEY, 0)
+    if version != _makes_version:
+        with _makes_lock:
+            if version != _makes_version:
+                _makes = sorted((i.upper(), i) for i in modelCatalog.objects.values_list("make", flat=True).distinct())
+                _makes_version = version
+    return _makes
+
+
+def touch_index():
+    cache.set(VERSION_KEY, time.time(), None)
+
+
+def suggest_makes(term, limit=10):
+    """typeahead: makes starting with `term`, topped up with close spellings when there are fewer than `limit`"""
+    term = term.strip().upper()
+    makes = make_index()
+    if not term:
+        return []
+    start = bisect.bisect_left(makes, (term,))
+    found = []
+    for upper, name in makes[start:]:
+        if not upper.startswith(term) or len(found) == limit:
+            break
+        found.append(name)
+    if len(found) < limit:
+        names = dict(makes)
+        for upper in difflib.get_close_matches(term, names, n=limit, cutoff=0.6):
+            if names[upper] not in found:
+                found.append(names[upper])
+    return found[:limit]
+
+
+def resolve_make(name):
+    """the catalog spelling of `name`: an exact match, else the only make starting with it, else the closest one"""
+    term = name.strip().upper()
+    names = dict(make_index())
+    if term in names:
+        return names[term]
+    suggestions = suggest_makes(term, limit=2)
+    prefixed = [i for i in suggestions if i.upper().startswith(term)]
+    if len(prefixed) == 1:
+        return prefixed[0]
+    if not prefixed and suggestions:
+        return suggestions[0]
+    return None
+
+
+def models_for_make(make, year=None, vehicle_type=None):
+    """sorted model names of a catalog make, same filters as nhtsa.models_for_make but without leaving the database"""
+    queryset = modelCatalog.objects.filter(make=make)
+    if year and vehicle_type:
+        queryset = queryset.filter(year=year, vehicle_type=vehicle_type)
+    elif year:
+        queryset = queryset.filter(year=year, vehicle_type="")
+    elif vehicle_type:
+        queryset = queryset.filter(year__isnull=False, vehicle_type=vehicle_type)
+    else:
+        queryset = queryset.filter(year__isnull=True)
+    return list(queryset.order_by("model").values_list("model", flat=True).distinct())
+
+
+def fetch_make(make, years, workers=None):
+    """
+    every vPIC list of one make: all years, then each year on its own and each year per vehicle type.
+    Raises NHTSAError when any list is missing, so a half fetched make never replaces a complete one
+    """
+    lookups = [(None, None)] + [(year, vehicle_type) for year in years for vehicle_type in (None, *VEHICLE_TYPES)]
+
+    def fetch(lookup):
+        year, vehicle_type = lookup
+        # ? past the response cache, a sync that only replayed last week's answers would never pick up new models
+        return year, vehicle_type, nhtsa.models_for_make(make, year=year, vehicle_type=vehicle_type, fresh=True)
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=workers or nhtsa.option("NHTSA_BATCH_WORKERS", nhtsa.BATCH_WORKERS)) as pool:
+        for year, vehicle_type, results in pool.map(fetch, lookups):
+            for i in results:
+                if i.get("Model_Name") and i.get("Make_Name"):
+                    rows.append(modelCatalog(make_id=i["Make_ID"], make=i["Make_Name"].strip().upper(), model_id=i["Model_ID"],
+                                             model=i["Model_Name"].strip(), year=year, vehicle_type=vehicle_type or ""))
+    return rows
+
+
+def sync_catalog(makes=None, years=None):
+    """
+    reloads the catalog of the given makes (default NHTSA_CATALOG_MAKES) from vPIC, one transaction per make.
+    A make vPIC can't fully answer for keeps its old rows. Returns the number of stored models
+    """
+    makes = makes or getattr(settings, "NHTSA_CATALOG_MAKES", DEFAULT_MAKES)
+    years = years or catalog_years()
+    stored = 0
+    for make in makes:
+        try:
+            rows = fetch_make(make, years)
+        except nhtsa.NHTSAError as error:
+            logger.warning("catalog sync of %s failed: %s", make, error)
+            continue
+        with transaction.atomic():
+            modelCatalog.objects.filter(make__in={i.make for i in rows} | {make.upper()}).delete()
+            modelCatalog.objects.bulk_create(rows, batch_size=1000)
+        stored += len(rows)
+    touch_index()
+    logger.info("catalog sync stored %s models of %s makes", stored, len(makes))
+    return stored
@@ -1,5 +1,7 @@
 from django import forms
+from django.conf import settings
 from .models import submittingNewCars
+from .vin import normalize_vin, parse_vins, vin_error
 
 class CarForm(forms.ModelForm):
     class Meta:
@@ -32,12 +34,51 @@ class NHTSA_API_CarModelSearchForm(forms.Form):
         ("Low Speed Vehicle", "Low Speed Vehicle (LSV)"),
         ("Off Road Vehicle", "Off Road Vehicle")
     ]        
-    query_company_name = forms.CharField(label="company name*", max_length=255, widget=forms.TextInput(attrs={"placeholder": "Ford"}), required=True)
+    query_company_name = forms.CharField(label="company name*", max_length=255, widget=forms.TextInput(attrs={"placeholder": "Ford", "list": "makes", "autocomplete": "off"}), required=True)
     query_year = forms.IntegerField(label="year", widget=forms.TextInput(attrs={"placeholder":"2015"}), required=False)
     query_vehicle_type = forms.ChoiceField(label="vehicle type", choices=VehicelTypeChoices, required=False)
 
 
 
 class NHTSA_API_VinDecoderForm(forms.Form):
-    query_vin_number = forms.CharField(label="Vin number", required=True, max_length=17)
-    query_year = forms.IntegerField(label="year", required=False)
\ No newline at end of file
+    query_vin_number = forms.CharField(label="Vin number", required=True, max_length=20)
+    query_year = forms.IntegerField(label="year", required=False)
+    query_manufacturer_only = forms.BooleanField(label="manufacturer only", required=False,
+                                                 help_text="maker, country and model year, answered without asking NHTSA")
+
+    def clean_query_vin_number(self):
+        # ? a VIN that can't be valid never reaches NHTSA
+        vin = normalize_vin(self.cleaned_data["query_vin_number"])
+        error = vin_error(vin)
+        if error:
+            raise forms.ValidationError(error)
+        return vin
+
+
+
+class NHTSA_API_VinBatchDecoderForm(forms.Form):
+
+    OutputChoices = [
+        ("html", "table"),
+        ("csv", "CSV file"),
+        ("json", "JSON file"),
+    ]
+    query_vin_numbers = forms.CharField(label="Vin numbers", required=False, widget=forms.Textarea(attrs={"placeholder": "one VIN per line"}))
+    query_vin_file = forms.FileField(label="or a CSV file", required=False, help_text="a 'vin' column, or the VINs in the first column")
+    query_year = forms.IntegerField(label="year", required=False)
+    output = forms.ChoiceField(label="output", choices=OutputChoices, initial="html")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        try:
+            vins = parse_vins(cleaned_data.get("query_vin_numbers", ""), cleaned_data.get("query_vin_file"))
+        except (UnicodeDecodeError, ValueError):
+            raise forms.ValidationError("the file has to be a UTF-8 CSV")
+
+        limit = getattr(settings, "NHTSA_BATCH_LIMIT", 1000)
+        if not vins:
+            raise forms.ValidationError("paste some VINs or upload a CSV file")
+        if len(vins) > limit:
+            raise forms.ValidationError(f"at most {limit} VINs per batch, got {len(vins)}")
+        cleaned_data["vins"] = vins
+        return cleaned_data
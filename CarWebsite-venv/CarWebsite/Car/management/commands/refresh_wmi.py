@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from Car.predecoder import refresh_wmi_table
+
+
+class Command(BaseCommand):
+    help = "reloads the WMI table the offline VIN pre-decoder reads from vPIC, same as the daily scheduled job"
+
+    def add_arguments(self, parser):
+        parser.add_argument("manufacturers", nargs="*", help="only these manufacturers, default: NHTSA_WMI_MANUFACTURERS and every make in the table")
+
+    def handle(self, *args, **options):
+        saved = refresh_wmi_table(options["manufacturers"] or None)
+        self.stdout.write(f"{saved} WMIs saved")
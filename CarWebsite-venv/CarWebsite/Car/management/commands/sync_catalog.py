@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from Car.catalog import sync_catalog
+
+
+class Command(BaseCommand):
+    help = "reloads the local model catalog the model search reads from vPIC, same as the daily scheduled job"
+
+    def add_arguments(self, parser):
+        parser.add_argument("makes", nargs="*", help="only these makes, default: NHTSA_CATALOG_MAKES")
+        parser.add_argument("--years", nargs="+", type=int, help="default: the last 15 model years and next year's")
+
+    def handle(self, *args, **options):
+        stored = sync_catalog(options["makes"] or None, options["years"])
+        self.stdout.write(f"{stored} models stored")
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.11 on 2026-10-18 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Car', '0003_delete_formula1'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='manufacturerIdentifiers',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wmi', models.CharField(max_length=6, unique=True, verbose_name='WMI')),
+                ('manufacturer', models.CharField(max_length=255)),
+                ('make', models.CharField(blank=True, max_length=100)),
+                ('country', models.CharField(blank=True, max_length=100)),
+                ('vehicle_type', models.CharField(blank=True, max_length=100, verbose_name='vehicle type')),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'manufacturer identifier',
+                'verbose_name_plural': 'manufacturer identifiers',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.11 on 2026-10-18 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Car', '0004_manufacturer_identifiers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='modelCatalog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('make_id', models.IntegerField()),
+                ('make', models.CharField(max_length=100)),
+                ('model_id', models.IntegerField()),
+                ('model', models.CharField(max_length=255)),
+                ('year', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('vehicle_type', models.CharField(blank=True, max_length=100, verbose_name='vehicle type')),
+                ('synced', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'catalog model',
+                'verbose_name_plural': 'model catalog',
+                'indexes': [models.Index(fields=['make', 'year', 'vehicle_type', 'model'], name='catalog_search_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.11 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+def keep_latest(apps, schema_editor):
+    # ? the old updater inserted a row on every change, only the newest one was ever read
+    GeneralInformation = apps.get_model("Car", "GeneralInformation")
+    latest = GeneralInformation.objects.order_by("-id").values_list("id", flat=True).first()
+    GeneralInformation.objects.exclude(id=latest).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Car', '0005_model_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_latest, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='generalinformation',
+            name='checksum',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='generalinformation',
+            name='key',
+            field=models.CharField(default='carapi', max_length=50, unique=True),
+        ),
+        migrations.AddField(
+            model_name='generalinformation',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='generalinformation',
+            name='validators',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
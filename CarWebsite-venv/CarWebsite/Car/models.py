@@ -76,4 +76,49 @@ class submittingNewCars(models.Model):
 
 
 class GeneralInformation(models.Model):
-    info = models.JSONField()
\ No newline at end of file
+    # ? one row per source, upserted by the scheduler only when the checksum of `info` changes
+    key = models.CharField(max_length=50, unique=True, default="carapi")
+    info = models.JSONField()
+    checksum = models.CharField(max_length=64, blank=True)
+    validators = models.JSONField(default=dict, blank=True)  # ? ETag / Last-Modified of every attribute, for conditional requests
+    updated = models.DateTimeField(auto_now=True)
+
+
+
+# ? World Manufacturer Identifiers (the first VIN characters), refreshed from vPIC by the scheduler
+class manufacturerIdentifiers(models.Model):
+    wmi = models.CharField(max_length=6, unique=True, verbose_name="WMI")  # ? 6 for small makers: the 3 characters + positions 12-14
+    manufacturer = models.CharField(max_length=255)
+    make = models.CharField(max_length=100, blank=True)
+    country = models.CharField(max_length=100, blank=True)
+    vehicle_type = models.CharField(max_length=100, blank=True, verbose_name="vehicle type")
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.wmi} - {self.manufacturer}"
+
+    class Meta:
+        verbose_name = 'manufacturer identifier'
+        verbose_name_plural = 'manufacturer identifiers'
+
+
+
+# ? local copy of vPIC's make -> year -> vehicle type -> models lists, the model search reads only from here
+class modelCatalog(models.Model):
+    make_id = models.IntegerField()
+    make = models.CharField(max_length=100)
+    model_id = models.IntegerField()
+    model = models.CharField(max_length=255)
+    year = models.PositiveSmallIntegerField(null=True, blank=True)  # ? empty: listed for the make regardless of year
+    vehicle_type = models.CharField(max_length=100, blank=True, verbose_name="vehicle type")  # ? empty: any type
+    synced = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.make} {self.model}"
+
+    class Meta:
+        verbose_name = 'catalog model'
+        verbose_name_plural = 'model catalog'
+        indexes = [
+            models.Index(fields=["make", "year", "vehicle_type", "model"], name="catalog_search_idx"),
+        ]
@@ -0,0 +1,162 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from requests_cache import CachedSession
+from urllib3.util.retry import Retry
+from .vin import vin_error, vin_warning
+
+# ? every value can be overridden in settings.py, the defaults are the public vPIC service
+DEFAULT_BASE_URL = "https://vpic.nhtsa.dot.gov/api/vehicles/"
+DEFAULT_TIMEOUT = (3.05, 15)  # ? (connect, read) seconds
+DEFAULT_CACHE_TTL = 60 * 60 * 24 * 7  # ? vPIC only changes with new model years
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+POOL_SIZE = 10
+BATCH_SIZE = 50  # ? the most VINs DecodeVINValuesBatch accepts per call
+BATCH_WORKERS = 4
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class NHTSAError(Exception):
+    pass
+
+
+def option(name, default):
+    return getattr(settings, name, default)
+
+
+def build_session():
+    """one pooled, retrying session with an on-disk response cache, shared by all threads of the process"""
+    backend = option("NHTSA_CACHE_BACKEND", "sqlite")
+    cache_name = "nhtsa"
+    if backend == "sqlite":
+        cache_dir = option("NHTSA_CACHE_DIR", os.path.join(settings.BASE_DIR, "cache"))
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_name = os.path.join(cache_dir, "nhtsa")
+
+    # ? the only POST sent is the batch VIN decode, which is a read, so it is cached and retried like a GET
+    session = CachedSession(cache_name, backend=backend, expire_after=option("NHTSA_CACHE_TTL", DEFAULT_CACHE_TTL),
+                            allowable_codes=(200,), allowable_methods=("GET", "POST"), stale_if_error=True)
+    retry = Retry(total=option("NHTSA_RETRIES", DEFAULT_RETRIES), backoff_factor=option("NHTSA_RETRY_BACKOFF", DEFAULT_RETRY_BACKOFF),
+                  status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET", "POST"), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def reset_session():
+    # ? for tests and settings changes, the next call builds a new session
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def request_json(method, path, fresh=False, **kwargs):
+    """`fresh` skips the response cache for this request only and stores the new answer in it"""
+    url = option("NHTSA_BASE_URL", DEFAULT_BASE_URL) + path
+    try:
+        response = get_session().request(method, url, timeout=option("NHTSA_TIMEOUT", DEFAULT_TIMEOUT),
+                                         force_refresh=fresh, **kwargs)
+        response.raise_for_status()
+        return response.json()
+    except (RequestException, ValueError) as error:
+        raise NHTSAError(f"NHTSA request failed: {error}") from error
+
+
+def get_json(path, fresh=False, **params):
+    return request_json("GET", path, fresh=fresh, params={**params, "format": "json"})
+
+
+def models_for_make(make, year=None, vehicle_type=None, fresh=False):
+    """the vPIC model list of a make, optionally for one model year and/or vehicle type"""
+    path = f"GetModelsForMake/{quote(make.lower())}"
+    if year or vehicle_type:
+        path = f"GetModelsForMakeYear/make/{quote(make.lower())}"
+        if year:
+            path += f"/modelyear/{int(year)}"
+        if vehicle_type:
+            path += f"/vehicletype/{quote(vehicle_type.lower())}"
+    return get_json(path, fresh=fresh).get("Results", [])
+
+
+def decode_vin(vin, model_year=None):
+    """the flat decodevinvalues record of one VIN"""
+    params = {"modelyear": model_year} if model_year else {}
+    results = get_json(f"DecodeVinValues/{quote(vin.strip().upper())}", **params).get("Results", [])
+    if not results:
+        raise NHTSAError(f"NHTSA returned no result for {vin}")
+    return results[0]
+
+
+def decode_wmi(wmi):
+    """the vPIC record of one World Manufacturer Identifier, None when vPIC doesn't know it"""
+    results = get_json(f"DecodeWMI/{quote(wmi.upper())}").get("Results", [])
+    return results[0] if results else None
+
+
+def wmis_for_manufacturer(manufacturer):
+    """every WMI registered to the manufacturers whose name contains `manufacturer`"""
+    return get_json(f"GetWMIsForManufacturer/{quote(manufacturer.lower())}").get("Results", [])
+
+
+def decode_vin_chunk(vins, model_year=None):
+    """one DecodeVINValuesBatch call for at most BATCH_SIZE VINs, results keyed by VIN"""
+    data = ";".join(f"{i},{model_year}" if model_year else i for i in vins)
+    results = request_json("POST", "DecodeVINValuesBatch/", data={"format": "json", "data": data}).get("Results", [])
+    return {i.get("VIN", "").upper(): i for i in results}
+
+
+def decode_vins(vins, model_year=None, workers=None):
+    """
+    decodes many VINs: invalid ones are answered locally, the rest go to vPIC in concurrent chunks of BATCH_SIZE.
+    Returns one row per input VIN, in input order, with an "Error" that is empty for decoded VINs
+    and a "Warning" for decoded VINs whose optional check digit doesn't match
+    """
+    unique = list(dict.fromkeys(vins))
+    rows = {}
+    valid = []
+    for vin in unique:
+        error = vin_error(vin)
+        if error:
+            rows[vin] = {"VIN": vin, "Error": error}
+        else:
+            valid.append(vin)
+
+    chunks = [valid[i:i + BATCH_SIZE] for i in range(0, len(valid), BATCH_SIZE)]
+
+    def decode(chunk):
+        try:
+            return chunk, decode_vin_chunk(chunk, model_year), None
+        except NHTSAError as error:
+            return chunk, {}, str(error)
+
+    with ThreadPoolExecutor(max_workers=workers or option("NHTSA_BATCH_WORKERS", BATCH_WORKERS)) as pool:
+        for chunk, decoded, error in pool.map(decode, chunks):
+            for vin in chunk:
+                if vin in decoded:
+                    # ? vPIC's own error code 0 means a clean decode, anything else is passed on as the row's error
+                    upstream = decoded[vin].get("ErrorText", "") if decoded[vin].get("ErrorCode", "0") != "0" else ""
+                    rows[vin] = {"VIN": vin, "Error": upstream, **{k: v for k, v in decoded[vin].items() if k != "VIN"}}
+                    if vin_warning(vin):
+                        rows[vin]["Warning"] = vin_warning(vin)
+                else:
+                    rows[vin] = {"VIN": vin, "Error": error or "missing from the NHTSA response"}
+    return [rows[i] for i in vins]
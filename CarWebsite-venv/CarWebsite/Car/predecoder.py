@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from . import nhtsa
+from .models import manufacturerIdentifiers
+from .vin import vin_error, vin_warning
+
+logger = logging.getLogger(__name__)
+
+# ? position 10, one code per year, the same 30 codes repeat every 30 years starting with 1980
+YEAR_CODES = "ABCDEFGHJKLMNPRSTVWXY123456789"
+FIRST_CYCLE = 1980
+
+# ? ISO 3780 regions of the first character, and the countries that own a whole first character
+REGIONS = {**dict.fromkeys("ABCDEFGH", "Africa"), **dict.fromkeys("JKLMNPR", "Asia"),
+           **dict.fromkeys("STUVWXYZ", "Europe"), **dict.fromkeys("12345", "North America"),
+           **dict.fromkeys("67", "Oceania"), **dict.fromkeys("89", "South America")}
+COUNTRIES = {"1": "United States", "4": "United States", "5": "United States", "2": "Canada", "3": "Mexico",
+             "J": "Japan", "L": "China", "W": "Germany", "6": "Australia", "9": "Brazil"}
+
+DEFAULT_MANUFACTURERS = ("audi", "bmw", "chrysler", "ford", "general motors", "honda", "hyundai", "kia", "mazda",
+                         "mercedes", "mitsubishi", "nissan", "porsche", "subaru", "tesla", "toyota", "volkswagen", "volvo")
+VERSION_KEY = "car:wmi:version"
+
+_index = {}
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def model_year(vin):
+    """
+    the model year coded at position 10. For North American cars a letter at position 7 means the 2010 cycle and
+    a digit the 1980 one; elsewhere the latest year that isn't past next year is the best guess
+    """
+    if vin[9] not in YEAR_CODES:
+        return None
+    year = FIRST_CYCLE + YEAR_CODES.index(vin[9])
+    latest = timezone.now().year + 1
+    if vin[0] in "12345" and vin[6].isdigit():
+        return year
+    while year + 30 <= latest:
+        year += 30
+    return year
+
+
+def wmi_candidates(vin):
+    # ? makers building under 1000 cars a year share a WMI ending in 9 and are told apart by positions 12-14
+    if vin[2] == "9":
+        return [vin[:3] + vin[11:14], vin[:3]]
+    return [vin[:3]]
+
+
+def wmi_index():
+    """WMI -> manufacturer dict of the whole table, reloaded whenever another process changed the table"""
+    global _index, _index_version
+    version = cache.get(VERSION_KEY, 0)
+    if version != _index_version:
+        with _index_lock:
+            if version != _index_version:
+                _index = {i["wmi"]: i for i in manufacturerIdentifiers.objects.values("wmi", "manufacturer", "make", "country", "vehicle_type")}
+                _index_version = version
+    return _index
+
+
+def touch_index():
+    cache.set(VERSION_KEY, time.time(), None)
+
+
+@receiver([post_save, post_delete], sender=manufacturerIdentifiers)
+def identifiers_changed(sender, **kwargs):
+    # ? edits through the admin have to reach the in-memory index too
+    touch_index()
+
+
+def predecode(vin):
+    """
+    everything that can be read from the VIN itself and the local WMI table, without a network call.
+    `vin` has to be normalized; "error" is set for invalid VINs, "warning" for a check digit that only matters
+    in North America, and "manufacturer" is None for unknown WMIs
+    """
+    info = {"VIN": vin, "error": vin_error(vin), "warning": vin_warning(vin), "wmi": vin[:3], "manufacturer": None,
+            "make": "", "vehicle_type": "", "country": "", "region": "", "model_year": None}
+    if info["error"]:
+        return info
+
+    info["region"] = REGIONS.get(vin[0], "")
+    info["country"] = COUNTRIES.get(vin[0], "")
+    info["model_year"] = model_year(vin)
+    index = wmi_index()
+    for wmi in wmi_candidates(vin):
+        if wmi in index:
+            info.update({k: v for k, v in index[wmi].items() if v})
+            break
+    return info
+
+
+def save_identifiers(rows):
+    """upserts {"wmi", "manufacturer", ...} rows in one query and tells every process to reload its index"""
+    if not rows:
+        return 0
+    objects = [manufacturerIdentifiers(updated=timezone.now(), **i) for i in {i["wmi"]: i for i in rows}.values()]
+    manufacturerIdentifiers.objects.bulk_create(objects, update_conflicts=True, unique_fields=["wmi"],
+                                                update_fields=["manufacturer", "make", "country", "vehicle_type", "updated"])
+    touch_index()
+    return len(objects)
+
+
+def learn_wmi(vin):
+    """
+    asks vPIC about the WMI of an unknown VIN once and keeps the answer, so the next lookup of that maker is local.
+    Returns the predecoded VIN, raises NHTSAError when vPIC isn't reachable
+    """
+    for wmi in wmi_candidates(vin):
+        record = nhtsa.decode_wmi(wmi)
+        if record and record.get("ManufacturerName"):
+            save_identifiers([{"wmi": wmi, "manufacturer": record["ManufacturerName"].strip(), "make": (record.get("Make") or "").strip(),
+                               "country": COUNTRIES.get(wmi[0], ""), "vehicle_type": (record.get("VehicleType") or "").strip()}])
+            break
+    return predecode(vin)
+
+
+def refresh_wmi_table(manufacturers=None):
+    """
+    reloads the WMIs of the configured manufacturers and of every maker already in the table from vPIC.
+    A maker vPIC can't answer for keeps its old rows. Returns the number of saved WMIs
+    """
+    if manufacturers is None:
+        manufacturers = getattr(settings, "NHTSA_WMI_MANUFACTURERS", DEFAULT_MANUFACTURERS)
+        makes = manufacturerIdentifiers.objects.exclude(make="").values_list("make", flat=True).distinct()
+        manufacturers = list(dict.fromkeys(i.lower() for i in [*manufacturers, *makes]))
+    known = {i["wmi"]: i for i in manufacturerIdentifiers.objects.values("wmi", "make")}
+    rows = []
+    for manufacturer in manufacturers:
+        try:
+            results = nhtsa.wmis_for_manufacturer(manufacturer)
+        except nhtsa.NHTSAError as error:
+            logger.warning("WMI refresh of %s failed: %s", manufacturer, error)
+            continue
+        for i in results:
+            wmi = (i.get("WMI") or "").strip().upper()
+            if not wmi or len(wmi) > 6 or not i.get("Name"):
+                continue
+            rows.append({"wmi": wmi, "manufacturer": i["Name"].strip(), "make": known.get(wmi, {}).get("make", ""),
+                         "country": (i.get("Country") or "").strip().title(), "vehicle_type": (i.get("VehicleType") or "").strip()})
+    saved = save_identifiers(rows)
+    logger.info("WMI table refresh saved %s identifiers of %s manufacturers", saved, len(manufacturers))
+    return saved
@@ -1,3 +1,363 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from . import carapi, catalog, nhtsa
+from .forms import NHTSA_API_VinDecoderForm
+from .models import GeneralInformation, manufacturerIdentifiers, modelCatalog
+from .predecoder import model_year, predecode, learn_wmi, refresh_wmi_table, touch_index, VERSION_KEY
+from .vin import check_digit, vin_error, vin_warning, parse_vins
 
-# Create your tests here.
+
+class StubVPIC(BaseHTTPRequestHandler):
+    """answers like vPIC; `failures` 503s come first, `delay` slows every answer down"""
+    failures = 0
+    delay = 0
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(self.path)
+        if type(self).failures:
+            type(self).failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        time.sleep(type(self).delay)
+        if "DecodeVinValues" in self.path:
+            body = {"Results": [{"VIN": self.path.split("/")[-1].split("?")[0], "Make": "FORD", "ModelYear": "2015"}]}
+        elif "DecodeWMI" in self.path:
+            body = {"Results": [{"ManufacturerName": "FORD MOTOR COMPANY, USA", "Make": "FORD", "VehicleType": "Passenger Car"}]}
+        elif "GetWMIsForManufacturer/ford" in self.path:
+            body = {"Results": [{"WMI": "1FA", "Name": "FORD MOTOR COMPANY, USA", "Country": "UNITED STATES (USA)", "VehicleType": "Passenger Car"},
+                                {"WMI": "1FT", "Name": "FORD MOTOR COMPANY, USA", "Country": "UNITED STATES (USA)", "VehicleType": "Truck "}]}
+        elif "GetWMIsForManufacturer" in self.path:
+            body = {"Results": []}
+        else:
+            body = {"Results": [{"Make_ID": 460, "Make_Name": "FORD", "Model_ID": 1861, "Model_Name": "Focus"},
+                                {"Make_ID": 460, "Make_Name": "FORD", "Model_ID": 1781, "Model_Name": "Mustang"}]}
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        body = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8"))
+        vins = [i.split(",")[0] for i in body["data"][0].split(";")]
+        type(self).requests.append(f"{self.path} {len(vins)}")
+        if type(self).failures:
+            type(self).failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        # ? vPIC flags undecodable VINs with an error code instead of leaving them out
+        results = [{"VIN": i, "Make": "FORD", "ErrorCode": "0" if i[0] == "1" else "11", "ErrorText": "" if i[0] == "1" else "bad WMI"} for i in vins]
+        content = json.dumps({"Results": results}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_vin(prefix, serial):
+    vin = f"{prefix}0{serial:06d}"
+    return vin[:8] + check_digit(vin) + vin[9:]
+
+
+class StubVPICMixin:
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubVPIC)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings = override_settings(NHTSA_BASE_URL=f"http://127.0.0.1:{cls.server.server_port}/api/vehicles/",
+                                         NHTSA_CACHE_BACKEND="memory", NHTSA_RETRY_BACKOFF=0, NHTSA_TIMEOUT=(1, 0.5))
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        nhtsa.reset_session()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        nhtsa.reset_session()
+        StubVPIC.failures = 0
+        StubVPIC.delay = 0
+        StubVPIC.requests = []
+
+
+class NHTSAClientTests(StubVPICMixin, SimpleTestCase):
+    def test_models_for_make_builds_the_vpic_path(self):
+        models = nhtsa.models_for_make("Ford", year=2015, vehicle_type="Passenger Car")
+        self.assertEqual([i["Model_Name"] for i in models], ["Focus", "Mustang"])
+        self.assertEqual(StubVPIC.requests, ["/api/vehicles/GetModelsForMakeYear/make/ford/modelyear/2015/vehicletype/passenger%20car?format=json"])
+
+    def test_repeated_lookups_are_served_from_the_cache(self):
+        nhtsa.models_for_make("Ford")
+        started = time.perf_counter()
+        nhtsa.models_for_make("ford")
+        nhtsa.decode_vin("1fadp3f2xfl123456")
+        nhtsa.decode_vin("1FADP3F2XFL123456")
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(len(StubVPIC.requests), 2)
+
+    def test_failures_are_retried(self):
+        StubVPIC.failures = 2
+        self.assertEqual(nhtsa.decode_vin("1FADP3F2XFL123456", model_year=2015)["Make"], "FORD")
+        self.assertEqual(len(StubVPIC.requests), 3)
+        self.assertIn("modelyear=2015", StubVPIC.requests[-1])
+
+    def test_gives_up_after_the_retry_limit(self):
+        StubVPIC.failures = 10
+        with self.assertRaises(nhtsa.NHTSAError):
+            nhtsa.models_for_make("Ford")
+        self.assertEqual(len(StubVPIC.requests), 1 + nhtsa.DEFAULT_RETRIES)
+
+    @override_settings(NHTSA_RETRIES=0)
+    def test_slow_upstream_times_out(self):
+        StubVPIC.delay = 2
+        started = time.perf_counter()
+        with self.assertRaises(nhtsa.NHTSAError):
+            nhtsa.models_for_make("Ford")
+        self.assertLess(time.perf_counter() - started, 1.5)
+
+    def test_session_is_shared(self):
+        self.assertIs(nhtsa.get_session(), nhtsa.get_session())
+
+    def test_batches_are_sent_in_chunks_of_50(self):
+        vins = [make_vin("1FADP3F2FL", i) for i in range(120)]
+        rows = nhtsa.decode_vins(["TOO-SHORT"] + vins + [vins[0]])
+        self.assertEqual(sorted(StubVPIC.requests), ["/api/vehicles/DecodeVINValuesBatch/ 20",
+                                                     "/api/vehicles/DecodeVINValuesBatch/ 50",
+                                                     "/api/vehicles/DecodeVINValuesBatch/ 50"])
+        self.assertEqual([i["VIN"] for i in rows], ["TOO-SHORT"] + vins + [vins[0]])
+        self.assertIn("17 characters", rows[0]["Error"])
+        self.assertEqual(rows[1], {"VIN": vins[0], "Error": "", "Make": "FORD", "ErrorCode": "0", "ErrorText": ""})
+
+    def test_batch_keeps_per_vin_errors(self):
+        StubVPIC.failures = 10
+        good, unknown = make_vin("1FADP3F2FL", 1), make_vin("9FADP3F2FL", 2)
+        rows = nhtsa.decode_vins([good, unknown])
+        self.assertTrue(all("NHTSA request failed" in i["Error"] for i in rows))
+
+        StubVPIC.failures = 0
+        nhtsa.reset_session()
+        rows = nhtsa.decode_vins([good, unknown])
+        self.assertEqual([i["Error"] for i in rows], ["", "bad WMI"])
+
+    def test_batch_sends_european_vins_despite_the_check_digit(self):
+        european, american = "WVWZZZ1JZXW000001", "1FADP3F21FL123456"
+        rows = nhtsa.decode_vins([european, american])
+        self.assertEqual(StubVPIC.requests, ["/api/vehicles/DecodeVINValuesBatch/ 1"])
+        self.assertEqual((rows[0]["Make"], rows[0]["Warning"]), ("FORD", vin_warning(european)))
+        self.assertIn("check digit", rows[1]["Error"])
+        self.assertNotIn("Warning", rows[1])
+
+
+class VinTests(SimpleTestCase):
+
+    def test_check_digit(self):
+        self.assertIsNone(vin_error("1M8GDM9AXKP042788"))
+        self.assertIn("check digit", vin_error("1M8GDM9A1KP042788"))
+        self.assertIn("letters", vin_error("1M8GDM9AXKP04278O"))
+        self.assertIn("17 characters", vin_error("1M8GDM9AXKP0427"))
+
+    def test_check_digit_is_only_required_in_north_america(self):
+        self.assertIsNone(vin_error("WVWZZZ1JZXW000001"))
+        self.assertIn("only required in North America", vin_warning("WVWZZZ1JZXW000001"))
+        self.assertIsNone(vin_warning("1M8GDM9AXKP042788"))
+        self.assertIsNone(vin_warning("1M8GDM9A1KP042788"))
+
+    def test_parse_vins(self):
+        self.assertEqual(parse_vins("1m8gdm9axkp042788, 1M8GDM9A-XKP042788\n\n"), ["1M8GDM9AXKP042788"] * 2)
+
+
+class PredecoderTests(StubVPICMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # ? a new version, so no test reuses the in-memory index an earlier one loaded
+        touch_index()
+
+    def test_model_year(self):
+        self.assertEqual(model_year("1M8GDM9AXKP042788"), 1989)
+        self.assertEqual(model_year("1FADP3F23FL123456"), 2015)
+        self.assertEqual(model_year("WVWZZZ1KZAW000001"), 2010)
+        self.assertIsNone(model_year("WVWZZZ1KZ0W000001"))
+
+    def test_invalid_vins_never_reach_nhtsa(self):
+        form = NHTSA_API_VinDecoderForm({"query_vin_number": "1fadp3f2-1fl123456"})
+        self.assertFalse(form.is_valid())
+        self.assertIn("check digit", form.errors["query_vin_number"][0])
+        self.assertEqual(StubVPIC.requests, [])
+
+    def test_european_vins_are_decoded_with_a_warning(self):
+        vin = "WVWZZZ1JZXW000001"
+        self.assertTrue(NHTSA_API_VinDecoderForm({"query_vin_number": vin}).is_valid())
+        response = self.client.post("/car/vindecoder/", {"query_vin_number": vin})
+        self.assertContains(response, "which is only required in North America")
+        self.assertEqual(len(StubVPIC.requests), 1)
+        self.assertIn(f"DecodeVinValues/{vin}", StubVPIC.requests[0])
+
+    def test_known_wmis_are_answered_locally(self):
+        manufacturerIdentifiers.objects.create(wmi="1FA", manufacturer="FORD MOTOR COMPANY, USA", make="FORD", country="United States (Usa)")
+        cache.delete(VERSION_KEY)
+        info = predecode("1FADP3F23FL123456")
+        self.assertEqual((info["manufacturer"], info["make"], info["model_year"]), ("FORD MOTOR COMPANY, USA", "FORD", 2015))
+        with self.assertNumQueries(0):
+            predecode("1FADP3F23FL123456")
+        self.assertEqual(StubVPIC.requests, [])
+
+    def test_unknown_wmis_are_learned_once(self):
+        info = learn_wmi("1FTDP3F24FL123456")
+        self.assertEqual(info["manufacturer"], "FORD MOTOR COMPANY, USA")
+        self.assertEqual(predecode("1FTDP3F24FL123456")["make"], "FORD")
+        self.assertEqual(StubVPIC.requests, ["/api/vehicles/DecodeWMI/1FT?format=json"])
+
+    def test_refresh_upserts_the_table(self):
+        manufacturerIdentifiers.objects.create(wmi="1FA", manufacturer="FORD", make="FORD")
+        self.assertEqual(refresh_wmi_table(["ford", "unknown"]), 2)
+        self.assertEqual(list(manufacturerIdentifiers.objects.order_by("wmi").values_list("wmi", "make", "country", "vehicle_type")),
+                         [("1FA", "FORD", "United States (Usa)", "Passenger Car"), ("1FT", "", "United States (Usa)", "Truck")])
+        self.assertEqual(predecode("1FTDP3F24FL123456")["manufacturer"], "FORD MOTOR COMPANY, USA")
+
+
+class CatalogTests(StubVPICMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.delete(catalog.VERSION_KEY)
+
+    def test_sync_fetches_every_list_of_a_make(self):
+        self.assertEqual(catalog.sync_catalog(["ford"], years=[2015]), 2 * (1 + len(catalog.VEHICLE_TYPES) + 1))
+        self.assertEqual(len(StubVPIC.requests), 1 + len(catalog.VEHICLE_TYPES) + 1)
+        # ? a sync always asks vPIC again instead of replaying the cached answers
+        catalog.sync_catalog(["ford"], years=[2015])
+        self.assertEqual(len(StubVPIC.requests), 2 * (1 + len(catalog.VEHICLE_TYPES) + 1))
+        self.assertEqual(modelCatalog.objects.count(), 2 * (1 + len(catalog.VEHICLE_TYPES) + 1))
+
+    def test_failed_sync_keeps_the_old_rows(self):
+        catalog.sync_catalog(["ford"], years=[2015])
+        nhtsa.reset_session()
+        StubVPIC.failures = 100
+        self.assertEqual(catalog.sync_catalog(["ford"], years=[2015]), 0)
+        self.assertEqual(catalog.models_for_make("FORD"), ["Focus", "Mustang"])
+
+    def test_search_is_served_locally(self):
+        catalog.sync_catalog(["ford"], years=[2015])
+        StubVPIC.requests = []
+        self.assertEqual(catalog.suggest_makes("fo"), ["FORD"])
+        self.assertEqual(catalog.resolve_make("frod"), "FORD")
+        self.assertIsNone(catalog.resolve_make("tesla"))
+        self.assertEqual(catalog.models_for_make("FORD", year=2015, vehicle_type="Truck"), ["Focus", "Mustang"])
+        self.assertEqual(catalog.models_for_make("FORD", year=2016), [])
+
+        response = self.client.post("/car/search_model/", {"query_company_name": "ford", "query_year": "2015"})
+        self.assertEqual(response.context["result"], ["Focus", "Mustang"])
+        response = self.client.post("/car/search_model/", {"query_company_name": "ford", "query_year": "1950"})
+        self.assertIn("year not in the catalog", response.context["error"])
+        self.assertEqual(self.client.get("/car/search_model/makes/?q=f").json(), ["FORD"])
+        self.assertEqual(StubVPIC.requests, [])
+
+
+class StubCarAPI(BaseHTTPRequestHandler):
+    """answers vehicle-attributes with an ETag per value, a matching If-None-Match gets a 304"""
+    values = {}
+    broken = False
+    requests = []
+
+    def do_GET(self):
+        attribute = parse_qs(urlparse(self.path).query)["attribute"][0]
+        type(self).requests.append((attribute, self.headers.get("If-None-Match")))
+        if type(self).broken:
+            self.send_response(404)
+            self.end_headers()
+            return
+        content = json.dumps(type(self).values.get(attribute, [attribute])).encode("utf-8")
+        etag = f'"{hash(content)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class GeneralInformationUpdaterTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubCarAPI)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings = override_settings(CARAPI_URL=f"http://127.0.0.1:{cls.server.server_port}/api/vehicle-attributes")
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubCarAPI.values = {}
+        StubCarAPI.broken = False
+        StubCarAPI.requests = []
+
+    def test_writes_one_row_only_when_the_payload_changes(self):
+        self.assertTrue(carapi.GeneralInformation_Model_Updater())
+        self.assertEqual(GeneralInformation.objects.get().info["valves"], ["engines.valves"])
+        self.assertEqual(len(StubCarAPI.requests), len(carapi.ATTRIBUTES))
+
+        StubCarAPI.requests = []
+        with self.assertNumQueries(1):
+            self.assertFalse(carapi.GeneralInformation_Model_Updater())
+        self.assertTrue(all(etag for _, etag in StubCarAPI.requests))
+
+        StubCarAPI.values = {"engines.valves": [16, 24]}
+        self.assertTrue(carapi.GeneralInformation_Model_Updater())
+        self.assertEqual(GeneralInformation.objects.get().info["valves"], [16, 24])
+        self.assertEqual(GeneralInformation.objects.get().info["cylinders"], ["engines.cylinders"])
+
+    def test_failed_fetch_keeps_the_stored_row(self):
+        carapi.GeneralInformation_Model_Updater()
+        StubCarAPI.values = {"engines.valves": [16]}
+        StubCarAPI.broken = True
+        self.assertFalse(carapi.GeneralInformation_Model_Updater())
+        self.assertEqual(GeneralInformation.objects.get().info["valves"], ["engines.valves"])
+
+    def test_latency_is_recorded_per_attribute(self):
+        carapi.GeneralInformation_Model_Updater()
+        stats = carapi.fetch_latency_stats()
+        self.assertEqual(set(stats), set(carapi.ATTRIBUTES))
+        self.assertEqual(stats["engines.valves"]["status"], 200)
+        self.assertGreater(stats["engines.valves"]["last_ms"], 0)
+
+    def test_concurrent_latencies_are_all_counted(self):
+        cache.delete(carapi.LATENCY_KEY.format("engines.valves"))
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: carapi.record_latency("engines.valves", 0.01, 200), range(200)))
+        stats = carapi.fetch_latency_stats()["engines.valves"]
+        self.assertEqual(stats["count"], 200)
+        self.assertEqual(stats["avg_ms"], 10.0)
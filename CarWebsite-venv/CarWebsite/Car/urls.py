@@ -8,7 +8,11 @@ urlpatterns = [
     path("", views.MainView, name="main"),
     path("add_car/", views.AddCarView, name="add_car"),
     path("search_model/", views.NHTSA_CarModelSearchFormView, name="NHTSA_MY_search"),
+    path("search_model/makes/", views.NHTSA_CarMakeSuggestionsView, name="NHTSA_make_suggestions"),
     path("vindecoder/", views.NHTSA_API_VinDecoderView, name="NHTSA_VinDecoder"),
+    path("vindecoder/batch/", views.NHTSA_API_VinBatchDecoderView, name="NHTSA_VinBatchDecoder"),
+    path("api/vindecoder/batch/", views.NHTSA_API_VinBatchDecoderAPI, name="NHTSA_VinBatchDecoder_api"),
+    path("api/carapi-stats/", views.CarAPIFetchStatsView, name="carapi_stats"),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,20 +1,30 @@
 from django.shortcuts import render, redirect
+from django.http import HttpResponse, JsonResponse
+from django.conf import settings
 from django.contrib import messages
 
-from rest_framework.decorators import api_view
-from rest_framework.parsers import JSONParser
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from io import BytesIO
 
-from .forms import CarForm, NHTSA_API_CarModelSearchForm, NHTSA_API_VinDecoderForm
+from .forms import CarForm, NHTSA_API_CarModelSearchForm, NHTSA_API_VinDecoderForm, NHTSA_API_VinBatchDecoderForm
 from .models import submittingNewCars, GeneralInformation
 from types import SimpleNamespace
-import requests
+import csv
+import io
+from . import catalog, nhtsa
+from .nhtsa import NHTSAError
+from .predecoder import predecode, learn_wmi
+from .carapi import fetch_latency_stats
+from .vin import normalize_vin
+import logging
+logger = logging.getLogger(__name__)
 # Create your views here.
 
 def MainView(request):
-    general_info = GeneralInformation.objects.all().last()
-    info = general_info.info
+    general_info = GeneralInformation.objects.filter(key="carapi").first()
+    # ? empty until the scheduler has fetched the attributes once
+    info = general_info.info if general_info else {}
     context = {
         "body_type":info.get("body_types", []),
         "cylinders":info.get("cylinders", []),
@@ -53,94 +63,136 @@ def AddCarView(request):
 def NHTSA_CarModelSearchFormView(request):
     result = []
     flag = False
+    error = None
+    make = None
     if request.method == "POST":
         form = NHTSA_API_CarModelSearchForm(request.POST)
         if form.is_valid():
             flag = True
-            temp = NHTSA_CarModelSearchResultsView(request, company_name=form.cleaned_data.get("query_company_name"),
-                                        year=form.cleaned_data.get("query_year"),
-                                        vehicle_type=form.cleaned_data.get("query_vehicle_type"))
-            
-            for i in temp:
-                result.append(i["Model_Name"])
-            result = sorted(result)
-            context = {
-                "form":form,
-                "result":result,
-                "flag":flag
-            }
-
-        else:
-            context = {
-                "form":form,
-                "result":result,
-                "flag":flag
-            }
+            make = catalog.resolve_make(form.cleaned_data.get("query_company_name"))
+            year = form.cleaned_data.get("query_year")
+            years = catalog.catalog_years()
+            if make is None:
+                error = "this company is not in the catalog yet"
+            elif year and year not in years:
+                error = f"year not in the catalog, it covers {min(years)} to {max(years)}"
+            else:
+                result = NHTSA_CarModelSearchResultsView(request, company_name=make,
+                                            year=form.cleaned_data.get("query_year"),
+                                            vehicle_type=form.cleaned_data.get("query_vehicle_type"))
     else:
         form = NHTSA_API_CarModelSearchForm()
-        context = {
-                "form":form,
-                "result":result,
-                "flag":flag
-            }
+
+    context = {
+        "form":form,
+        "result":result,
+        "flag":flag,
+        "error":error,
+        "make":make
+    }
     return render(request, "NHTSA/CarModel.html", context)
     
 
 
 def NHTSA_CarModelSearchResultsView(request, company_name, year, vehicle_type):
+    # ? served from the local catalog, the sync job is the only thing that talks to vPIC
+    return catalog.models_for_make(company_name, year=year, vehicle_type=vehicle_type)
 
-    company_name = company_name.lower()
-    url_values = {}
-    url = 'https://vpic.nhtsa.dot.gov/api/vehicles/'
-    if company_name:
-        url_values["company_name"] = f'GetModelsForMake/{company_name}'
-    
-    if year:
-        url_values["company_name"] = f"getmodelsformakeyear/make/{company_name}"
-        url_values["year"] = f'/modelyear/{year}'
-
-    if vehicle_type:
-        url_values["company_name"] = f"getmodelsformakeyear/make/{company_name}"
-        url_values["vehicle_type"] = f"/vehicleType/{vehicle_type}/"
-
-    for i in url_values.keys():
-        url += url_values[i]
-
-    url += '?format=json'
-    recieved = requests.get(url)
-    r = BytesIO(recieved.content)
-    parser = JSONParser()
-    data = parser.parse(stream=r)
-    items = data.get('Results', [])
 
-    return items
+def NHTSA_CarMakeSuggestionsView(request):
+    return JsonResponse(catalog.suggest_makes(request.GET.get("q", "")), safe=False)
 
 
 
 def NHTSA_API_VinDecoderView(request):
+    context = {}
     if request.method == "POST":
         form = NHTSA_API_VinDecoderForm(request.POST)
 
         if form.is_valid():
-            url = "https://vpic.nhtsa.dot.gov/api/vehicles/decodevinvalues/{}?format=json".format(
-                str(form.cleaned_data["query_vin_number"]).upper()
-            )
-            if form.cleaned_data["query_year"]:
-                url = "https://vpic.nhtsa.dot.gov/api/vehicles/decodevinvalues/{}?format=json&modelyear={}".format(
-                    str(form.cleaned_data["query_vin_number"]).upper(),
-                    form.cleaned_data["query_year"]
-                )
-            
-            recieved = requests.get(url)
-            if recieved.status_code == 200:
-                r = BytesIO(recieved.content)
-                parser = JSONParser()
-                data = parser.parse(stream=r)
-                items = data['Results'][0]
-                vehicle_obj = SimpleNamespace(**items)
-                return render(request, "NHTSA/Vindecoder.html", {"vehicle":vehicle_obj, "form":form})
-            else:
-                print(f"Request failed with status: {recieved.status_code}")
+            vin = form.cleaned_data["query_vin_number"]
+            try:
+                predecoded = predecode(vin)
+                if form.cleaned_data["query_manufacturer_only"]:
+                    if predecoded["manufacturer"] is None:
+                        predecoded = learn_wmi(vin)
+                else:
+                    items = nhtsa.decode_vin(vin, form.cleaned_data["query_year"])
+                    context["vehicle"] = SimpleNamespace(**items)
+                context["predecoded"] = predecoded
+            except NHTSAError as e:
+                logger.warning(e)
+                context["error"] = "the NHTSA service is not reachable right now, please try again later"
     else:
         form = NHTSA_API_VinDecoderForm()
-        return render(request, "NHTSA/Vindecoder.html", {"form":form})
+    context["form"] = form
+    return render(request, "NHTSA/Vindecoder.html", context)
+
+
+
+
+def decoded_vins_csv(rows):
+    # ? VIN, Error and any Warning first, then every vPIC column in the order it first shows up
+    head = ["VIN", "Error"] + (["Warning"] if any("Warning" in row for row in rows) else [])
+    columns = list(dict.fromkeys(head + [key for row in rows for key in row]))
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, restval="")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def decoded_vins_response(rows, output):
+    if output == "csv":
+        response = HttpResponse(decoded_vins_csv(rows), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="decoded_vins.csv"'
+        return response
+    response = JsonResponse(rows, safe=False)
+    response["Content-Disposition"] = 'attachment; filename="decoded_vins.json"'
+    return response
+
+
+def NHTSA_API_VinBatchDecoderView(request):
+    context = {}
+    if request.method == "POST":
+        form = NHTSA_API_VinBatchDecoderForm(request.POST, request.FILES)
+
+        if form.is_valid():
+            rows = nhtsa.decode_vins(form.cleaned_data["vins"], form.cleaned_data["query_year"])
+            if form.cleaned_data["output"] != "html":
+                return decoded_vins_response(rows, form.cleaned_data["output"])
+            context["rows"] = rows
+            context["decoded"] = sum(1 for i in rows if not i["Error"])
+    else:
+        form = NHTSA_API_VinBatchDecoderForm()
+    context["form"] = form
+    return render(request, "NHTSA/VinBatchDecoder.html", context)
+
+
+
+@api_view(["POST"])
+def NHTSA_API_VinBatchDecoderAPI(request):
+    """{"vins": [...], "model_year": 2015} in, one row per VIN out; ?output=csv for a CSV file"""
+    vins = request.data.get("vins") if isinstance(request.data, dict) else None
+    if not isinstance(vins, list) or not all(isinstance(i, str) for i in vins):
+        return Response({"vins": "a list of VIN strings is required"}, status=400)
+    limit = getattr(settings, "NHTSA_BATCH_LIMIT", 1000)
+    if not vins or len(vins) > limit:
+        return Response({"vins": f"send between 1 and {limit} VINs"}, status=400)
+
+    model_year = request.data.get("model_year")
+    if model_year is not None and not isinstance(model_year, int):
+        return Response({"model_year": "a year as a number"}, status=400)
+
+    rows = nhtsa.decode_vins([normalize_vin(i) for i in vins], model_year)
+    if request.query_params.get("output") == "csv":
+        return decoded_vins_response(rows, "csv")
+    return Response(rows)
+
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def CarAPIFetchStatsView(request):
+    """last/average fetch latency of every carapi attribute the GeneralInformation updater reads, for staff only"""
+    return Response(fetch_latency_stats())
@@ -0,0 +1,63 @@
+import csv
+import io
+import re
+
+# ? 17 characters, I, O and Q are never used
+VIN_PATTERN = re.compile(r"^[A-HJ-NPR-Z0-9]{17}$")
+TRANSLITERATION = {**{str(i): i for i in range(10)},
+                   "A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7, "H": 8,
+                   "J": 1, "K": 2, "L": 3, "M": 4, "N": 5, "P": 7, "R": 9,
+                   "S": 2, "T": 3, "U": 4, "V": 5, "W": 6, "X": 7, "Y": 8, "Z": 9}
+WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+# ? first characters of North American VINs, the only region where the check digit is mandatory
+CHECK_DIGIT_REGIONS = "12345"
+
+
+def normalize_vin(vin):
+    return re.sub(r"[\s-]", "", vin).upper()
+
+
+def check_digit(vin):
+    remainder = sum(TRANSLITERATION[i] * j for i, j in zip(vin, WEIGHTS)) % 11
+    return "X" if remainder == 10 else str(remainder)
+
+
+def check_digit_error(vin):
+    if vin[8] != check_digit(vin):
+        return f"check digit is {vin[8]}, expected {check_digit(vin)}"
+    return None
+
+
+def vin_error(vin):
+    """
+    why `vin` can't be a VIN, or None. The check digit (9th character) is only enforced for North American VINs,
+    European and Asian makers often fill that position with a letter or a plain 0
+    """
+    if len(vin) != 17:
+        return f"a VIN has 17 characters, this one has {len(vin)}"
+    if not VIN_PATTERN.match(vin):
+        return "a VIN only has digits and the letters A-Z except I, O and Q"
+    if vin[0] in CHECK_DIGIT_REGIONS:
+        return check_digit_error(vin)
+    return None
+
+
+def vin_warning(vin):
+    """a check digit mismatch on a VIN from outside North America, which is still worth decoding"""
+    if vin_error(vin) is None and vin[0] not in CHECK_DIGIT_REGIONS:
+        error = check_digit_error(vin)
+        return f"{error}, which is only required in North America" if error else None
+    return None
+
+
+def parse_vins(text="", csv_file=None):
+    """VINs from pasted text (any whitespace/comma/semicolon separated) and/or a csv with a "vin" or first column"""
+    vins = [i for i in re.split(r"[\s,;]+", text) if i]
+    if csv_file is not None:
+        rows = list(csv.reader(io.StringIO(csv_file.read().decode("utf-8-sig"))))
+        column = 0
+        if rows and "vin" in [i.strip().lower() for i in rows[0]]:
+            column = [i.strip().lower() for i in rows[0]].index("vin")
+            rows = rows[1:]
+        vins += [row[column] for row in rows if len(row) > column and row[column].strip()]
+    return [normalize_vin(i) for i in vins]
@@ -41,7 +41,10 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'Formula1.apps.Formula1Config',
+    'API.apps.ApiConfig',
+    'Car.apps.CarConfig',
     'django_apscheduler',
     'rest_framework',
 ]
@@ -67,9 +70,49 @@ LOGGING = {
 REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'API.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'API.filters.WhitelistFilterBackend',
+    ],
+    # ? counted per client ip (or user) in the shared cache, the scoped rates guard the heavy endpoints
+    'DEFAULT_THROTTLE_CLASSES': [
+        'rest_framework.throttling.AnonRateThrottle',
+        'rest_framework.throttling.UserRateThrottle',
+        'rest_framework.throttling.ScopedRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '120/min',
+        'user': '600/min',
+        'results': '60/min',
+        'exports': '20/hour',
+    },
+    # ? seconds a view's serialized response is kept, by the view's cache_scope; missing or 0 turns caching off
+    'RESPONSE_CACHE_TIMEOUTS': {
+        'f1_data': 60 * 60 * 24,
+        'drivers': 60 * 60,
+        'circuits': 60 * 60 * 24,
+        'races': 60 * 60,
+        'constructors': 60 * 60,
+        'results': 60 * 10,
+        'batch_results': 60 * 10,
+    },
 }
 
+# ? shared between workers so the Formula1 dataset version (and its page cache) is the same everywhere
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    }
+}
+
+# ? csv/parquet snapshots of whole Formula1 tables, one file per table, format and data version
+F1_EXPORT_DIR = os.path.join(BASE_DIR, 'exports')
+
 MIDDLEWARE = [
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.middleware.security.SecurityMiddleware',
@@ -20,4 +20,6 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("F1/", include("Formula1.urls")),
+    path("api/", include("API.urls")),
+    path("car/", include("Car.urls")),
 ]
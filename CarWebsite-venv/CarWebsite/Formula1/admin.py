@@ -44,4 +44,10 @@ class resultAdmin(admin.ModelAdmin):
     list_filter = ['race_id', 'driver_id', 'constructor_id', 'starting_grid_position', 'final_position']
     search_fields = ['race_id__name', 'driver_id__first_name', 'driver_id__last_name', 'constructor_id__name']
     raw_id_fields = ['race_id', 'constructor_id', 'driver_id']
-    list_per_page = 25
\ No newline at end of file
+    list_per_page = 25
+@admin.register(driverCareerStints)
+class driverCareerStintsAdmin(admin.ModelAdmin):
+    list_display = ['driver_id', 'constructor_id', 'first_season', 'last_season']
+    search_fields = ['driver_id__first_name', 'driver_id__last_name', 'constructor_id__name']
+    raw_id_fields = ['driver_id', 'constructor_id']
+    list_per_page = 20
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class Formula1Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Formula1'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,109 @@
+import datetime
+import hashlib
+import time
+from functools import wraps
+from django.core.cache import cache
+from django.http import HttpResponse
+from .pagination import decode_cursor, encode_cursor
+
+DATASET_VERSION_KEY = "Formula1:dataset_version"
+TABLE_VERSION_KEY = "Formula1:table_version:{}"
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _seeded_version(key):
+    version = cache.get(key)
+    if version is None:
+        # ? seeded with the current time so pages cached before an eviction can never be served again
+        cache.add(key, int(time.time()), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def dataset_version():
+    return _seeded_version(DATASET_VERSION_KEY)
+
+
+def bump_dataset_version():
+    try:
+        return cache.incr(DATASET_VERSION_KEY)
+    except ValueError:
+        return dataset_version()
+
+
+def table_version_key(table, season=None):
+    if season is None:
+        return TABLE_VERSION_KEY.format(table)
+    return TABLE_VERSION_KEY.format(f"{table}:{season}")
+
+
+def table_version(table, season=None):
+    """version of one table (or one season of it); a unix timestamp, so it also serves as Last-Modified"""
+    return _seeded_version(table_version_key(table, season))
+
+
+def table_versions(*keys):
+    """versions for several (table, season) pairs in one cache round trip"""
+    cache_keys = [table_version_key(*i) for i in keys]
+    found = cache.get_many(cache_keys)
+    return [found[key] if key in found else table_version(*i) for key, i in zip(cache_keys, keys)]
+
+
+def touch_table(table, season=None):
+    # ? never goes backwards and always moves by at least 1, even for two changes in the same second
+    version = max(int(time.time()), table_version(table, season) + 1)
+    cache.set(table_version_key(table, season), version, timeout=None)
+    return version
+
+
+def page_cache_key(view_name, search="", page=""):
+    search_hash = hashlib.md5(search.encode("utf-8")).hexdigest()
+    page_hash = hashlib.md5(page.encode("utf-8")).hexdigest()
+    return f"Formula1:page:{view_name}:{dataset_version()}:{search_hash}:{page_hash}"
+
+
+def _cursor_key(cursor):
+    # ? the view renders the first page for anything that doesn't decode, so all of those share its entry
+    if cursor == "end":
+        return cursor
+    values = decode_cursor(cursor) if cursor else None
+    return encode_cursor(values) if values is not None else ""
+
+
+def cached_count(name, queryset, search=""):
+    search_hash = hashlib.md5(search.encode("utf-8")).hexdigest()
+    key = f"Formula1:count:{name}:{dataset_version()}:{search_hash}"
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, PAGE_CACHE_TIMEOUT)
+    return total
+
+
+def cached_page(view=None, daily=False):
+    """
+    caches the rendered page per view, search term and cursor until the F1 data changes.
+    `daily` pages also depend on today's date (completed/upcoming races) and are cached per day
+    """
+    if view is None:
+        return lambda view: cached_page(view, daily=daily)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return view(request, *args, **kwargs)
+
+        page = ":".join(_cursor_key(request.GET.get(i, "")) for i in ("after", "before"))
+        if daily:
+            page += f":{datetime.date.today()}"
+        key = page_cache_key(view.__name__, request.GET.get("search", "").strip(), page)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, (response.content, response["Content-Type"]), PAGE_CACHE_TIMEOUT)
+        return response
+    return wrapper
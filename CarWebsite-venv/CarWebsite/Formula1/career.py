@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from .models import results, driverCareerStints
+
+
+def build_stints(result_model, stint_model, **filters):
+    # ? one aggregated query grouped by (driver, constructor); the models are passed in so migrations can reuse it
+    rows = (result_model.objects.filter(**filters)
+            .values("driver_id", "constructor_id")
+            .annotate(first_season=Min("race_id__year"),
+                      last_season=Max("race_id__year"),
+                      total_races=Count("result_id"),
+                      wins=Count("result_id", filter=Q(final_position="1")),
+                      total_points=Coalesce(Sum("points"), 0))
+            .order_by())
+    return [stint_model(driver_id_id=i["driver_id"],
+                        constructor_id_id=i["constructor_id"],
+                        first_season=i["first_season"],
+                        last_season=i["last_season"],
+                        total_races=i["total_races"],
+                        wins=i["wins"],
+                        points=i["total_points"]) for i in rows]
+
+
+def rebuild_driver_stints(driver_id):
+    stints = build_stints(results, driverCareerStints, driver_id=driver_id)
+    with transaction.atomic():
+        driverCareerStints.objects.filter(driver_id=driver_id).delete()
+        driverCareerStints.objects.bulk_create(stints)
+    return stints
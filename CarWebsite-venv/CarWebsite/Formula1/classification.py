@@ -0,0 +1,67 @@
+import datetime
+from itertools import groupby
+from django.utils.dateparse import parse_duration
+from .models import results
+
+CLASSIFICATION_FIELDS = ["time_ms", "gap_ms", "status"]
+STATUS_CODES = set(results.StatusChoices.values)
+
+
+def parse_race_time(value):
+    # ? "1:34:50.616", "+5.478", "+1:02.345" and "+17.181s" -> milliseconds, lapped or missing times -> None
+    if not value:
+        return None
+    text = value.strip().lstrip("+")
+    if "lap" in text.lower():
+        return None
+    if text.endswith("s"):
+        text = text[:-1]
+    duration = parse_duration(text)
+    if duration is None:
+        return None
+    return duration // datetime.timedelta(milliseconds=1)
+
+
+def classify_results(race_results):
+    # ? race_results must hold every row of a single race, the winner's time is the reference for the others
+    winner = next((i for i in race_results if i.final_position == "1"), None)
+    winner_ms = parse_race_time(winner.time) if winner is not None else None
+
+    for i in race_results:
+        if i.final_position.isdigit():
+            i.status = results.StatusChoices.CLASSIFIED
+        else:
+            i.status = i.final_position if i.final_position in STATUS_CODES else None
+
+        i.time_ms, i.gap_ms = None, None
+        if i is winner:
+            i.time_ms = winner_ms
+            i.gap_ms = 0 if winner_ms is not None else None
+        elif i.time and i.time.strip().startswith("+"):
+            i.gap_ms = parse_race_time(i.time)
+            if i.gap_ms is not None and winner_ms is not None:
+                i.time_ms = winner_ms + i.gap_ms
+        elif i.time:
+            i.time_ms = parse_race_time(i.time)
+            if i.time_ms is not None and winner_ms is not None:
+                i.gap_ms = i.time_ms - winner_ms
+    return race_results
+
+
+def classify_race(race_id):
+    race_results = list(results.objects.filter(race_id=race_id).only("result_id", "final_position", "time"))
+    results.objects.bulk_update(classify_results(race_results), CLASSIFICATION_FIELDS)
+    return race_results
+
+
+def classify_all(result_model=results, batch_size=2000):
+    # ? used by the backfill migration, walks results race by race with a single cursor
+    queryset = result_model.objects.only("result_id", "race_id", "final_position", "time").order_by("race_id", "result_id")
+    pending = []
+    for _, race_results in groupby(queryset.iterator(chunk_size=batch_size), key=lambda i: i.race_id_id):
+        pending.extend(classify_results(list(race_results)))
+        if len(pending) >= batch_size:
+            result_model.objects.bulk_update(pending, CLASSIFICATION_FIELDS)
+            pending = []
+    if pending:
+        result_model.objects.bulk_update(pending, CLASSIFICATION_FIELDS)
@@ -0,0 +1,34 @@
+import datetime
+from django.core.cache import cache
+from django.db.models import Max
+from .models import races, results
+from .cache import dataset_version, PAGE_CACHE_TIMEOUT
+from .standings import driver_table, constructor_table
+
+LEADERS = 5
+
+
+def current_season():
+    # ? the latest season with at least one winner, a season that only has its calendar published is not "current" yet
+    return races.objects.filter(results__final_position="1").aggregate(season=Max("year"))["season"]
+
+
+def season_dashboard():
+    """winners, next race and championship leaders of the current season, cached until the data changes"""
+    today = datetime.date.today()
+    key = f"Formula1:dashboard:{dataset_version()}:{today}"
+    dashboard = cache.get(key)
+    if dashboard is not None:
+        return dashboard
+
+    season = current_season()
+    dashboard = {
+        "season":season,
+        "winners":list(results.objects.filter(race_id__year=season, final_position="1")
+                       .select_related("race_id", "driver_id", "constructor_id").order_by("race_id__round")),
+        "next_race":races.objects.filter(race_date__gte=today).select_related("circuit_id").order_by("race_date", "round").first(),
+        "driver_leaders":list(driver_table(season)[:LEADERS]) if season else [],
+        "constructor_leaders":list(constructor_table(season)[:LEADERS]) if season else [],
+    }
+    cache.set(key, dashboard, PAGE_CACHE_TIMEOUT)
+    return dashboard
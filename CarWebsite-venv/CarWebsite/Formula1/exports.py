@@ -0,0 +1,200 @@
+import csv
+import io
+import os
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.db import models
+from .models import drivers, constructors, circuits, races, results
+from .cache import dataset_version
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # ? parquet exports are optional, csv works without pyarrow
+    pyarrow = None
+
+# ? table name -> (model, lookup that limits the table to a set of seasons)
+EXPORT_TABLES = {
+    "results": (results, "race_id__year"),
+    "races": (races, "year"),
+    "drivers": (drivers, "results__race_id__year"),
+    "constructors": (constructors, "results__race_id__year"),
+    "circuits": (circuits, "races__year"),
+}
+EXPORT_FORMATS = ("csv", "parquet")
+CHUNK_SIZE = 5000
+
+
+class ExportError(Exception):
+    pass
+
+
+def export_columns(table):
+    return list(EXPORT_TABLES[table][0]._meta.concrete_fields)
+
+
+def export_queryset(table, seasons=None):
+    if table not in EXPORT_TABLES:
+        raise ExportError(f"unknown table {table}, use one of: {', '.join(EXPORT_TABLES)}")
+    model, season_lookup = EXPORT_TABLES[table]
+    queryset = model.objects.all()
+    if seasons:
+        queryset = queryset.filter(**{f"{season_lookup}__in": seasons})
+        if "__" in season_lookup:
+            # ? drivers, teams and circuits are reached through their results or races and would repeat
+            queryset = queryset.distinct()
+    return queryset.order_by("pk").values_list(*[i.name for i in export_columns(table)])
+
+
+def export_chunks(table, seasons=None):
+    """rows in lists of CHUNK_SIZE, read through a server-side cursor"""
+    chunk = []
+    for row in export_queryset(table, seasons).iterator(chunk_size=CHUNK_SIZE):
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_filename(table, file_format, seasons=None):
+    return f"{table}_{'-'.join(map(str, seasons)) if seasons else 'all'}.{file_format}"
+
+
+def snapshot_path(table, file_format):
+    # ? only whole tables are snapshotted, one file per table and format for each data version
+    return Path(settings.F1_EXPORT_DIR) / f"{table}_all_v{dataset_version()}.{file_format}"
+
+
+def _temporary_file(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    os.close(handle)
+    os.chmod(temporary, 0o644)
+    return temporary
+
+
+def csv_blocks(table, seasons=None):
+    """the csv export as text blocks of one chunk each, starting with the header"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([i.name for i in export_columns(table)])
+    for chunk in export_chunks(table, seasons):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+def iter_csv(table, seasons=None):
+    """
+    yields the csv export chunk by chunk. Season filtered exports are streamed straight from the database.
+    A whole table snapshot that is already on disk is read back, otherwise the rows are written to disk
+    while they are streamed and the file is only kept once complete
+    """
+    if seasons:
+        yield from csv_blocks(table, seasons)
+        return
+
+    path = snapshot_path(table, "csv")
+    if path.exists():
+        with open(path, "r", encoding="utf-8", newline="") as snapshot:
+            while block := snapshot.read(1 << 16):
+                yield block
+        return
+
+    temporary = _temporary_file(path)
+    try:
+        with open(temporary, "w", encoding="utf-8", newline="") as snapshot:
+            for block in csv_blocks(table):
+                snapshot.write(block)
+                yield block
+        os.replace(temporary, path)
+    finally:
+        # ? a client that disconnects half way leaves no partial snapshot behind
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def arrow_type(field):
+    if isinstance(field, (models.ForeignKey, models.AutoField, models.BigAutoField, models.IntegerField)):
+        return pyarrow.int64()
+    if isinstance(field, models.FloatField):
+        return pyarrow.float64()
+    if isinstance(field, models.BooleanField):
+        return pyarrow.bool_()
+    if isinstance(field, models.DateField):
+        return pyarrow.date32()
+    if isinstance(field, models.TimeField):
+        return pyarrow.time64("us")
+    if isinstance(field, models.DurationField):
+        return pyarrow.duration("us")
+    return pyarrow.string()
+
+
+def write_parquet(target, table, seasons=None):
+    """writes the export to a path or binary file, one row group per chunk"""
+    if pyarrow is None:
+        raise ExportError("parquet exports need pyarrow installed")
+
+    columns = export_columns(table)
+    schema = pyarrow.schema([pyarrow.field(i.name, arrow_type(i)) for i in columns])
+    with pyarrow.parquet.ParquetWriter(target, schema) as writer:
+        for chunk in export_chunks(table, seasons):
+            arrays = [pyarrow.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)]
+            writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+
+
+def parquet_snapshot(table):
+    """path of the whole table's parquet snapshot, written the first time it's asked for"""
+    if pyarrow is None:
+        raise ExportError("parquet exports need pyarrow installed")
+
+    path = snapshot_path(table, "parquet")
+    if path.exists():
+        return path
+
+    temporary = _temporary_file(path)
+    try:
+        write_parquet(temporary, table)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return path
+
+
+def parquet_file(table, seasons=None):
+    """
+    an open parquet export: the snapshot for a whole table, an anonymous temporary file for seasons,
+    which is gone as soon as it's closed so filtered exports never pile up on disk
+    """
+    if not seasons:
+        return open(parquet_snapshot(table), "rb")
+    handle = tempfile.TemporaryFile()
+    try:
+        write_parquet(handle, table, seasons)
+        handle.seek(0)
+    except BaseException:
+        handle.close()
+        raise
+    return handle
+
+
+def clear_old_snapshots():
+    """removes snapshots of earlier data versions, returns how many were deleted"""
+    directory = Path(settings.F1_EXPORT_DIR)
+    if not directory.exists():
+        return 0
+    current = f"_v{dataset_version()}."
+    removed = 0
+    for path in directory.iterdir():
+        # ? .part files belong to exports that are still being written
+        if path.is_file() and current not in path.name and path.suffix != ".part":
+            path.unlink()
+            removed += 1
+    return removed
@@ -0,0 +1,100 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from Formula1.models import drivers
+
+# ? every group has to show up in at least one plan of the view, any index of a group satisfies it
+EXPECTED_INDEXES = {
+    "main": [{"result_winner_idx", "result_race_position_idx"}],
+    "circuit_list": [{"circuit_country_idx"}],
+    "races_list": [{"race_year_round_idx"}],
+    "drivers_list": [{"driver_nationality_idx"}, {"driver_keyset_idx"}],
+    "driver_details": [{"result_driver_race_idx"}, {"stint_driver_season_idx"}],
+    "teams_list": [{"constructor_nationality_idx"}, {"result_constructor_race_idx"}],
+}
+
+
+def _index_tables():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexname, tablename FROM pg_indexes WHERE schemaname = current_schema()")
+        return dict(cursor.fetchall())
+
+
+def _plan_nodes(plan, key):
+    names = set()
+    if isinstance(plan, dict):
+        if key in plan and (key == "Index Name" or plan.get("Node Type") == "Seq Scan"):
+            names.add(plan[key])
+        for value in plan.values():
+            names |= _plan_nodes(value, key)
+    elif isinstance(plan, list):
+        for value in plan:
+            names |= _plan_nodes(value, key)
+    return names
+
+
+class Command(BaseCommand):
+    help = "runs EXPLAIN on the queries of the Formula1 views and checks that the hot path indexes are used"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--allow-seqscan", action="store_true",
+                            help="leave enable_seqscan on; small tables are then often scanned instead")
+
+    def _urls(self):
+        driver = drivers.objects.filter(results__isnull=False).values_list("driver_id", flat=True).first()
+        return {
+            "main": reverse("Formula1:main"),
+            "circuit_list": reverse("Formula1:circuit_list"),
+            "races_list": reverse("Formula1:races_list"),
+            "drivers_list": reverse("Formula1:drivers_list"),
+            "driver_details": reverse("Formula1:driver_details", args=[driver]) if driver else None,
+            "teams_list": reverse("Formula1:teams_list"),
+        }
+
+    def _used_indexes(self, queries, allow_seqscan):
+        used, scanned = set(), set()
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not allow_seqscan:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            for query in queries:
+                if not query["sql"].lstrip().upper().startswith("SELECT"):
+                    continue
+                cursor.execute("EXPLAIN (FORMAT JSON) " + query["sql"])
+                plan = cursor.fetchone()[0]
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                used |= _plan_nodes(plan, "Index Name")
+                scanned |= _plan_nodes(plan, "Relation Name")
+        return used, scanned
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("query plans can only be checked on PostgreSQL")
+
+        failures = []
+        client = Client()
+        index_tables = _index_tables()
+        # ? the page and data caches would hide the queries, so they are switched off for the check
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+                               ALLOWED_HOSTS=["*"]):
+            for name, url in self._urls().items():
+                if url is None:
+                    self.stdout.write(f"{name}: skipped, no data")
+                    continue
+                with CaptureQueriesContext(connection) as captured:
+                    client.get(url)
+                used, scanned = self._used_indexes(captured.captured_queries, options["allow_seqscan"])
+                missing = [group for group in EXPECTED_INDEXES[name] if not group & used]
+                # ? only possible with --allow-seqscan, still a failure but told apart from an index that can't be used
+                seqscans = [group for group in missing if any(index_tables.get(i) in scanned for i in group)]
+                status = "ok" if not missing else "MISSING " + ", ".join("/".join(sorted(i)) for i in missing)
+                if seqscans:
+                    status += " (WARNING: sequential scan of " + ", ".join(sorted({index_tables[i] for group in seqscans for i in group})) + ")"
+                self.stdout.write(f"{name}: {len(captured.captured_queries)} queries, indexes {sorted(used)} -> {status}")
+                if missing:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError("indexes not used by: " + ", ".join(failures))
@@ -0,0 +1,59 @@
+import shutil
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from Formula1.exports import (EXPORT_TABLES, EXPORT_FORMATS, ExportError, export_filename, iter_csv, csv_blocks,
+                              parquet_snapshot, write_parquet, snapshot_path, clear_old_snapshots)
+
+
+class Command(BaseCommand):
+    help = ("writes csv or parquet snapshots of whole Formula1 tables into F1_EXPORT_DIR, optionally copying them elsewhere. "
+            "Season exports are only written to --output")
+
+    def add_arguments(self, parser):
+        parser.add_argument("tables", nargs="*", help=f"any of {', '.join(EXPORT_TABLES)}, all of them by default")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", dest="file_format")
+        parser.add_argument("--season", type=int, action="append", dest="seasons", help="repeat for several seasons")
+        parser.add_argument("--output", help="directory the finished snapshots are copied to")
+        parser.add_argument("--clear-old", action="store_true", help="delete snapshots of earlier data versions first")
+
+    def handle(self, *args, **options):
+        if options["clear_old"]:
+            self.stdout.write(f"removed {clear_old_snapshots()} old snapshots")
+
+        tables = options["tables"] or list(EXPORT_TABLES)
+        unknown = [i for i in tables if i not in EXPORT_TABLES]
+        if unknown:
+            raise CommandError(f"unknown tables {', '.join(unknown)}, use any of: {', '.join(EXPORT_TABLES)}")
+
+        seasons = options["seasons"] or []
+        if seasons and not options["output"]:
+            raise CommandError("only whole tables are kept as snapshots, season exports need --output")
+        for table in tables:
+            try:
+                if seasons:
+                    path = Path(options["output"]) / export_filename(table, options["file_format"], seasons)
+                    self.write_seasons(path, table, options["file_format"], seasons)
+                    self.stdout.write(f"{table}: {path}")
+                    continue
+                if options["file_format"] == "csv":
+                    # ? exhausting the stream is what writes the snapshot to disk
+                    for _ in iter_csv(table):
+                        pass
+                    path = snapshot_path(table, "csv")
+                else:
+                    path = parquet_snapshot(table)
+            except ExportError as error:
+                raise CommandError(str(error))
+
+            if options["output"]:
+                path = shutil.copy(path, options["output"])
+            self.stdout.write(f"{table}: {path}")
+
+    def write_seasons(self, path, table, file_format, seasons):
+        # ? season exports are written straight to their destination, never kept in F1_EXPORT_DIR
+        if file_format == "parquet":
+            write_parquet(path, table, seasons)
+            return
+        with open(path, "w", encoding="utf-8", newline="") as export:
+            for block in csv_blocks(table, seasons):
+                export.write(block)
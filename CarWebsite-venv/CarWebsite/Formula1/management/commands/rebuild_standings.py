@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from Formula1.models import races
+from Formula1.standings import rebuild_season
+
+
+class Command(BaseCommand):
+    help = "rebuilds the driver and constructor standings of the given seasons round by round"
+
+    def add_arguments(self, parser):
+        parser.add_argument("seasons", nargs="*", type=int)
+        parser.add_argument("--all", action="store_true", help="rebuild every season that has results")
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            seasons = races.objects.filter(results__isnull=False).values_list("year", flat=True).distinct().order_by("year")
+        else:
+            seasons = options["seasons"]
+        if not seasons:
+            raise CommandError("pass one or more seasons or --all")
+
+        for year in seasons:
+            rounds = rebuild_season(year)
+            self.stdout.write(f"{year}: standings rebuilt for {rounds} rounds")
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from .models import results
+from .cache import table_versions, PAGE_CACHE_TIMEOUT
+
+
+def matrix_version_keys(year):
+    # ? the season's results plus the race and driver names, the same versions the API's ETag is built from
+    return [("results", year), ("races",), ("drivers",)]
+
+
+def season_matrix(year):
+    """a whole season as drivers x rounds arrays of positions and points, read with a single query"""
+    versions = ":".join(map(str, table_versions(*matrix_version_keys(year))))
+    key = f"Formula1:season_matrix:{versions}:{year}"
+    matrix = cache.get(key)
+    if matrix is not None:
+        return matrix
+
+    rows = (results.objects.filter(race_id__year=year)
+            .order_by("race_id__round", "result_id")
+            .values_list("race_id__round", "race_id__name", "driver_id", "driver_id__code",
+                         "driver_id__first_name", "driver_id__last_name", "final_position", "points"))
+
+    rounds = {}
+    driver_info = {}
+    cells = {}
+    for round_number, race_name, driver_id, code, first_name, last_name, position, points in rows:
+        rounds.setdefault(round_number, race_name)
+        driver_info.setdefault(driver_id, (code, f"{first_name} {last_name}"))
+        # ? non-numeric positions (retirements, disqualifications) are sent as null
+        position = int(position) if position.isdigit() else None
+        previous = cells.get((driver_id, round_number))
+        if previous is not None:
+            # ? a driver with two entries in one race keeps the better finish and the sum of the points
+            positions = [i for i in (position, previous[0]) if i is not None]
+            position = min(positions) if positions else None
+            points += previous[1]
+        cells[driver_id, round_number] = (position, points)
+
+    round_numbers = sorted(rounds)
+    totals = {i: 0 for i in driver_info}
+    for (driver_id, _), (position, points) in cells.items():
+        totals[driver_id] += points
+    # ? championship order, ties broken by driver id so the rows are stable between requests
+    driver_ids = sorted(driver_info, key=lambda i: (-totals[i], i))
+
+    matrix = {
+        "year":year,
+        "rounds":round_numbers,
+        "race_names":[rounds[i] for i in round_numbers],
+        "driver_ids":driver_ids,
+        "driver_codes":[driver_info[i][0] for i in driver_ids],
+        "driver_names":[driver_info[i][1] for i in driver_ids],
+        "total_points":[totals[i] for i in driver_ids],
+        "positions":[[cells.get((d, r), (None, None))[0] for r in round_numbers] for d in driver_ids],
+        "points":[[cells.get((d, r), (None, None))[1] for r in round_numbers] for d in driver_ids],
+    }
+    cache.set(key, matrix, PAGE_CACHE_TIMEOUT)
+    return matrix
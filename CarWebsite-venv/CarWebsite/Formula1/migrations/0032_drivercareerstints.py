@@ -0,0 +1,33 @@
+# Generated by Django 5.1.11 on 2026-10-18 10:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0031_alter_races_fp1_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='driverCareerStints',
+            fields=[
+                ('stint_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('first_season', models.IntegerField()),
+                ('last_season', models.IntegerField()),
+                ('total_races', models.PositiveSmallIntegerField(default=0)),
+                ('wins', models.PositiveSmallIntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('constructor_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='career_stints', to='Formula1.constructors')),
+                ('driver_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='career_stints', to='Formula1.drivers')),
+            ],
+            options={
+                'verbose_name': 'driver career stint',
+                'verbose_name_plural': 'driver career stints',
+                'indexes': [models.Index(fields=['driver_id', 'first_season'], name='stint_driver_season_idx')],
+                'constraints': [models.UniqueConstraint(fields=('driver_id', 'constructor_id'), name='unique_driver_constructor_stint')],
+            },
+        ),
+    ]
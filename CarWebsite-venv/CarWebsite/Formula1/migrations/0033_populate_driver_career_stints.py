@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def populate_stints(apps, schema_editor):
+    from Formula1.career import build_stints
+    result_model = apps.get_model("Formula1", "results")
+    stint_model = apps.get_model("Formula1", "driverCareerStints")
+    stint_model.objects.bulk_create(build_stints(result_model, stint_model), batch_size=1000)
+
+
+def clear_stints(apps, schema_editor):
+    apps.get_model("Formula1", "driverCareerStints").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0032_drivercareerstints'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_stints, clear_stints),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.11 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0033_populate_driver_career_stints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='results',
+            name='gap_ms',
+            field=models.BigIntegerField(blank=True, default=None, null=True, verbose_name='gap to winner (ms)'),
+        ),
+        migrations.AddField(
+            model_name='results',
+            name='status',
+            field=models.CharField(blank=True, choices=[('Classified', 'Classified'), ('DNF', 'Did not finish'), ('DNS', 'Did not start'), ('DNQ', 'Did not qualify'), ('NC', 'Not classified'), ('DSQ', 'Disqualified'), ('EX', 'Excluded')], default=None, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='results',
+            name='time_ms',
+            field=models.BigIntegerField(blank=True, default=None, null=True, verbose_name='race time (ms)'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def populate_classification(apps, schema_editor):
+    from Formula1.classification import classify_all
+    classify_all(apps.get_model("Formula1", "results"))
+
+
+def clear_classification(apps, schema_editor):
+    apps.get_model("Formula1", "results").objects.update(time_ms=None, gap_ms=None, status=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0034_results_gap_ms_results_status_results_time_ms'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_classification, clear_classification),
+    ]
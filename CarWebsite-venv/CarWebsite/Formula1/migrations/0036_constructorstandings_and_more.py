@@ -0,0 +1,53 @@
+# Generated by Django 5.1.11 on 2026-10-18 10:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0035_populate_results_classification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='constructorStandings',
+            fields=[
+                ('cs_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('points', models.SmallIntegerField()),
+                ('position', models.SmallIntegerField()),
+                ('wins_in_season', models.SmallIntegerField()),
+            ],
+            options={
+                'verbose_name': 'constructor standing',
+                'verbose_name_plural': 'constructor standings',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='driverstandings',
+            index=models.Index(fields=['race_id', 'position'], name='ds_race_position_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='driverstandings',
+            constraint=models.UniqueConstraint(fields=('race_id', 'driver_id'), name='unique_driver_standing_per_race'),
+        ),
+        migrations.AddField(
+            model_name='constructorstandings',
+            name='constructor_id',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='season_constructor_standing', to='Formula1.constructors'),
+        ),
+        migrations.AddField(
+            model_name='constructorstandings',
+            name='race_id',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='season_constructor_standing', to='Formula1.races'),
+        ),
+        migrations.AddIndex(
+            model_name='constructorstandings',
+            index=models.Index(fields=['race_id', 'position'], name='cs_race_position_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='constructorstandings',
+            constraint=models.UniqueConstraint(fields=('race_id', 'constructor_id'), name='unique_constructor_standing_per_race'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.11 on 2026-10-18 10:45
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0036_constructorstandings_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='constructors',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='constructor_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='drivers',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('first_name'), name='gin_trgm_ops'), name='driver_first_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='drivers',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('last_name'), name='gin_trgm_ops'), name='driver_last_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='drivers',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nationality'), name='gin_trgm_ops'), name='driver_nationality_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='drivers',
+            index=models.Index(fields=['number'], name='driver_number_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.11 on 2026-10-18 10:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0037_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='constructors',
+            index=models.Index(fields=['name', 'constructor_id'], name='constructor_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='drivers',
+            index=models.Index(fields=['first_name', 'last_name', 'driver_id'], name='driver_keyset_idx'),
+        ),
+    ]
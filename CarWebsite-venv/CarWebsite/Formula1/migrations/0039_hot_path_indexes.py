@@ -0,0 +1,45 @@
+# Generated by Django 5.1.11 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0038_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='circuits',
+            index=models.Index(fields=['country'], name='circuit_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='constructors',
+            index=models.Index(fields=['nationality'], name='constructor_nationality_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='drivers',
+            index=models.Index(fields=['nationality'], name='driver_nationality_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='races',
+            index=models.Index(fields=['year', 'round'], name='race_year_round_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='results',
+            index=models.Index(fields=['race_id', 'final_position'], name='result_race_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='results',
+            index=models.Index(condition=models.Q(('final_position', '1')), fields=['race_id'], name='result_winner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='results',
+            index=models.Index(fields=['driver_id', 'race_id'], name='result_driver_race_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='results',
+            index=models.Index(fields=['constructor_id', 'race_id'], name='result_constructor_race_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def backfill_standings(apps, schema_editor):
+    # ? the standings engine only writes on result changes, existing seasons are built here once
+    from Formula1.standings import season_rows
+    result_model = apps.get_model("Formula1", "results")
+    driver_model = apps.get_model("Formula1", "driverStandings")
+    constructor_model = apps.get_model("Formula1", "constructorStandings")
+    driver_model.objects.all().delete()
+    constructor_model.objects.all().delete()
+    for year in result_model.objects.values_list("race_id__year", flat=True).distinct().order_by("race_id__year"):
+        driver_rows, constructor_rows = season_rows(year, result_model, driver_model, constructor_model)
+        driver_model.objects.bulk_create(driver_rows, batch_size=1000)
+        constructor_model.objects.bulk_create(constructor_rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0039_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_standings, migrations.RunPython.noop),
+    ]
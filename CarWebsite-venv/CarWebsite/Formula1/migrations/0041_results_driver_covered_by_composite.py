@@ -0,0 +1,19 @@
+# Generated by Django 5.1.11 on 2026-10-18 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Formula1', '0040_backfill_standings'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='results',
+            name='driver_id',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='results', to='Formula1.drivers'),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+import datetime
 
 # Create your models here.
 class Formula1Data(models.Model):
@@ -31,6 +34,15 @@ class drivers(models.Model):
     class Meta:
         verbose_name = 'driver'
         verbose_name_plural = 'drivers'
+        # ? icontains compiles to UPPER(col) LIKE ..., so the trigram indexes are built on UPPER(col)
+        indexes = [
+            GinIndex(OpClass(Upper("first_name"), name="gin_trgm_ops"), name="driver_first_name_trgm"),
+            GinIndex(OpClass(Upper("last_name"), name="gin_trgm_ops"), name="driver_last_name_trgm"),
+            GinIndex(OpClass(Upper("nationality"), name="gin_trgm_ops"), name="driver_nationality_trgm"),
+            models.Index(fields=["number"], name="driver_number_idx"),
+            models.Index(fields=["first_name", "last_name", "driver_id"], name="driver_keyset_idx"),
+            models.Index(fields=["nationality"], name="driver_nationality_idx"),
+        ]
 
 class circuits(models.Model):
     circuit_id = models.BigAutoField(primary_key=True)
@@ -48,6 +60,9 @@ class circuits(models.Model):
     class Meta:
         verbose_name = 'circuit'
         verbose_name_plural = 'circuits'
+        indexes = [
+            models.Index(fields=["country"], name="circuit_country_idx"),
+        ]
 
 class races(models.Model):
     race_id = models.BigAutoField(primary_key=True)
@@ -76,10 +91,13 @@ class races(models.Model):
     class Meta:
         verbose_name = 'race'
         verbose_name_plural = 'races'
+        indexes = [
+            models.Index(fields=["year", "round"], name="race_year_round_idx"),
+        ]
 
 
 
-# todo - shows the drivers standings in one season
+# ? championship table after each race, filled round by round by Formula1.standings
 class driverStandings(models.Model):
     ds_id = models.BigAutoField(primary_key=True)
     race_id = models.ForeignKey(races, on_delete=models.PROTECT, related_name="season_driver_standing")
@@ -91,6 +109,12 @@ class driverStandings(models.Model):
     class Meta:
         verbose_name = 'driver standing'
         verbose_name_plural = 'driver standings'
+        constraints = [
+            models.UniqueConstraint(fields=["race_id", "driver_id"], name="unique_driver_standing_per_race"),
+        ]
+        indexes = [
+            models.Index(fields=["race_id", "position"], name="ds_race_position_idx"),
+        ]
 
 
 
@@ -106,11 +130,45 @@ class constructors(models.Model):
     class Meta:
         verbose_name = 'constructor'
         verbose_name_plural = 'constructors'
+        indexes = [
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="constructor_name_trgm"),
+            models.Index(fields=["name", "constructor_id"], name="constructor_keyset_idx"),
+            models.Index(fields=["nationality"], name="constructor_nationality_idx"),
+        ]
+
+class constructorStandings(models.Model):
+    cs_id = models.BigAutoField(primary_key=True)
+    race_id = models.ForeignKey(races, on_delete=models.PROTECT, related_name="season_constructor_standing")
+    constructor_id = models.ForeignKey(constructors, on_delete=models.PROTECT, related_name="season_constructor_standing")
+    points = models.SmallIntegerField()
+    position = models.SmallIntegerField()
+    wins_in_season = models.SmallIntegerField()
+
+    class Meta:
+        verbose_name = 'constructor standing'
+        verbose_name_plural = 'constructor standings'
+        constraints = [
+            models.UniqueConstraint(fields=["race_id", "constructor_id"], name="unique_constructor_standing_per_race"),
+        ]
+        indexes = [
+            models.Index(fields=["race_id", "position"], name="cs_race_position_idx"),
+        ]
 
 class results(models.Model):
+
+    class StatusChoices(models.TextChoices):
+        CLASSIFIED = "Classified", "Classified"
+        DNF = "DNF", "Did not finish"
+        DNS = "DNS", "Did not start"
+        DNQ = "DNQ", "Did not qualify"
+        NC = "NC", "Not classified"
+        DSQ = "DSQ", "Disqualified"
+        EX = "EX", "Excluded"
+
     result_id = models.BigAutoField(primary_key=True)
     race_id = models.ForeignKey(races, on_delete=models.PROTECT, related_name="results")
-    driver_id = models.ForeignKey(drivers, on_delete=models.PROTECT, related_name="results")
+    # ? no index of its own, result_driver_race_idx leads with driver_id and serves the same lookups
+    driver_id = models.ForeignKey(drivers, on_delete=models.PROTECT, related_name="results", db_index=False)
     constructor_id = models.ForeignKey(constructors, on_delete=models.PROTECT, related_name="results")
     car_number = models.SmallIntegerField()
     starting_grid_position = models.SmallIntegerField()
@@ -121,9 +179,62 @@ class results(models.Model):
     fastest_lap = models.DurationField()
     top_speed_of_fl = models.FloatField(verbose_name="fastest lap top speed") # ? fl = fastest lap
 
+    # ? filled by Formula1.classification whenever the race's results change
+    time_ms = models.BigIntegerField(blank=True, null=True, default=None, verbose_name="race time (ms)")
+    gap_ms = models.BigIntegerField(blank=True, null=True, default=None, verbose_name="gap to winner (ms)")
+    status = models.CharField(max_length=10, choices=StatusChoices.choices, blank=True, null=True, default=None)
+
     def __str__(self):
         return f"results of {self.driver_id.first_name} {self.driver_id.last_name} for {self.race_id}"
+
+    def race_time_display(self):
+        # ? lapped cars have no absolute time, the original "+1 lap" text is shown instead
+        if self.time_ms is None:
+            return self.time
+        hours, rest = divmod(self.time_ms, 3_600_000)
+        minutes, rest = divmod(rest, 60_000)
+        seconds, millis = divmod(rest, 1000)
+        return f"{hours}:{minutes:02d}:{seconds:02d}.{millis:03d}"
     
     class Meta:
         verbose_name = 'Result'
-        verbose_name_plural = 'Results'
\ No newline at end of file
+        verbose_name_plural = 'Results'
+        indexes = [
+            models.Index(fields=["race_id", "final_position"], name="result_race_position_idx"),
+            models.Index(fields=["race_id"], condition=models.Q(final_position="1"), name="result_winner_idx"),
+            models.Index(fields=["driver_id", "race_id"], name="result_driver_race_idx"),
+            models.Index(fields=["constructor_id", "race_id"], name="result_constructor_race_idx"),
+        ]
+
+
+
+# ? one row per driver/team pairing, rebuilt from results by Formula1.career
+class driverCareerStints(models.Model):
+    stint_id = models.BigAutoField(primary_key=True)
+    driver_id = models.ForeignKey(drivers, on_delete=models.CASCADE, related_name="career_stints")
+    constructor_id = models.ForeignKey(constructors, on_delete=models.CASCADE, related_name="career_stints")
+    first_season = models.IntegerField()
+    last_season = models.IntegerField()
+    total_races = models.PositiveSmallIntegerField(default=0)
+    wins = models.PositiveSmallIntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.driver_id} at {self.constructor_id} ({self.first_season} - {self.last_season})"
+
+    def season_range(self):
+        if self.first_season != self.last_season:
+            return f"{self.first_season} - {self.last_season}"
+        elif self.first_season == datetime.date.today().year:
+            return f"{self.first_season} - present"
+        return f"{self.first_season}"
+
+    class Meta:
+        verbose_name = 'driver career stint'
+        verbose_name_plural = 'driver career stints'
+        constraints = [
+            models.UniqueConstraint(fields=["driver_id", "constructor_id"], name="unique_driver_constructor_stint"),
+        ]
+        indexes = [
+            models.Index(fields=["driver_id", "first_season"], name="stint_driver_season_idx"),
+        ]
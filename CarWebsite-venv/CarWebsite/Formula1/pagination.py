@@ -0,0 +1,111 @@
+import base64
+import binascii
+import json
+from django.db import models
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def cursor_types(queryset, ordering):
+    """the python type a cursor value has to have for every ordering field, None where any value is accepted"""
+    types = []
+    for field in ordering:
+        name = field.lstrip("-")
+        annotation = queryset.query.annotations.get(name)
+        model_field = annotation.output_field if annotation is not None else queryset.model._meta.get_field(name)
+        if isinstance(model_field, models.IntegerField):
+            types.append(int)
+        elif isinstance(model_field, models.FloatField):
+            types.append((int, float))
+        elif isinstance(model_field, (models.CharField, models.TextField)):
+            types.append(str)
+        else:
+            types.append(None)
+    return types
+
+
+def decode_cursor(cursor, types=None):
+    """the cursor's values, or None for anything that isn't a cursor of this ordering"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeEncodeError):
+        return None
+    if not isinstance(values, list):
+        return None
+    if types is not None:
+        if len(values) != len(types):
+            return None
+        for value, expected in zip(values, types):
+            # ? bool is an int for isinstance, but never a valid key
+            if expected is not None and (isinstance(value, bool) or not isinstance(value, expected)):
+                return None
+    return values
+
+
+def _flip(field):
+    return field[1:] if field.startswith("-") else "-" + field
+
+
+def seek_filter(ordering, values, forward=True):
+    # ? (a > x) OR (a = x AND b > y) OR ... for the given ordering, "-field" turns the comparison around
+    q = Q(pk__in=[])
+    equal = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") == forward else "gt"
+        q |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return q
+
+
+class KeysetPage:
+    def __init__(self, object_list, ordering, has_next, has_previous, total):
+        self.object_list = object_list
+        self.ordering = ordering
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def _cursor(self, obj):
+        return encode_cursor([getattr(obj, field.lstrip("-")) for field in self.ordering])
+
+    @property
+    def next_cursor(self):
+        return self._cursor(self.object_list[-1]) if self.has_next else None
+
+    @property
+    def previous_cursor(self):
+        return self._cursor(self.object_list[0]) if self.has_previous else None
+
+
+def keyset_paginate(queryset, ordering, after=None, before=None, per_page=20, total=None):
+    """
+    seek pagination: `after`/`before` are cursors from a previous page, before="end" opens the last page.
+    A cursor that doesn't decode to values of the ordering's types is ignored, like no cursor at all
+    """
+    types = cursor_types(queryset, ordering)
+    if before:
+        values = decode_cursor(before, types) if before != "end" else None
+        if before == "end" or values is not None:
+            page = queryset.order_by(*[_flip(i) for i in ordering])
+            if values is not None:
+                page = page.filter(seek_filter(ordering, values, forward=False))
+            rows = list(page[:per_page + 1])
+            has_previous = len(rows) > per_page
+            return KeysetPage(rows[:per_page][::-1], ordering, values is not None, has_previous, total)
+
+    page = queryset.order_by(*ordering)
+    values = decode_cursor(after, types) if after else None
+    if values is not None:
+        page = page.filter(seek_filter(ordering, values, forward=True))
+    rows = list(page[:per_page + 1])
+    return KeysetPage(rows[:per_page], ordering, len(rows) > per_page, values is not None, total)
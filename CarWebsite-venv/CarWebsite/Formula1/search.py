@@ -0,0 +1,41 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import IntegerField, Q
+from django.db.models.functions import Cast, Greatest, Round
+
+RANK_SCALE = 10000
+
+
+def as_rank(similarity):
+    # ? similarity is a float4, which doesn't survive the round trip through a json cursor; a scaled int does
+    return Cast(Round(similarity * RANK_SCALE), IntegerField())
+
+
+def search_drivers(queryset, query):
+    """every term has to match a name, the nationality or (for digits) the car number; best matches first"""
+    terms = query.split()
+    if not terms:
+        return queryset
+
+    q = Q()
+    for term in terms:
+        term_q = Q(first_name__icontains=term) | Q(last_name__icontains=term) | Q(nationality__icontains=term)
+        if term.isdigit():
+            # ? exact match instead of number__icontains, which casts the column to text
+            term_q |= Q(number=int(term))
+        q &= term_q
+
+    rank = as_rank(Greatest(TrigramWordSimilarity(query, "first_name"),
+                            TrigramWordSimilarity(query, "last_name"),
+                            TrigramWordSimilarity(query, "nationality")))
+    return queryset.filter(q).annotate(rank=rank).order_by("-rank", "first_name", "last_name", "driver_id")
+
+
+def search_constructors(queryset, query):
+    terms = query.split()
+    if not terms:
+        return queryset
+
+    q = Q()
+    for term in terms:
+        q &= Q(name__icontains=term)
+    return queryset.filter(q).annotate(rank=as_rank(TrigramWordSimilarity(query, "name"))).order_by("-rank", "name", "constructor_id")
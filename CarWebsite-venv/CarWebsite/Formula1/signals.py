@@ -0,0 +1,85 @@
+import threading
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Formula1Data, drivers, constructors, circuits, races, results
+from .career import rebuild_driver_stints
+from .classification import classify_race
+from .standings import update_standings_for
+from .cache import bump_dataset_version, touch_table
+
+# ? what changed in the current transaction of this thread, rebuilt once when it commits
+_pending = threading.local()
+
+
+def pending():
+    if not hasattr(_pending, "drivers"):
+        _pending.drivers, _pending.races, _pending.tables = set(), set(), set()
+    return _pending
+
+
+def schedule_rebuild(driver_ids=(), race_ids=(), tables=()):
+    changes = pending()
+    changes.drivers.update(driver_ids)
+    changes.races.update(race_ids)
+    changes.tables.update(tables)
+    # ? registered on every change: a callback of a rolled back savepoint is dropped, the next one still runs.
+    # ? Outside a transaction on_commit runs right away, so single saves behave as before
+    transaction.on_commit(rebuild_pending)
+
+
+def rebuild_pending():
+    """one rebuild per driver, race and season for everything saved since the last commit"""
+    changes = pending()
+    driver_ids, race_ids, tables = changes.drivers, changes.races, changes.tables
+    if not (driver_ids or race_ids or tables):
+        return
+    changes.drivers, changes.races, changes.tables = set(), set(), set()
+
+    for driver_id in driver_ids:
+        rebuild_driver_stints(driver_id)
+    for race_id in race_ids:
+        classify_race(race_id)
+    update_standings_for(race_ids)
+    touch_result_seasons(*race_ids)
+    if tables:
+        bump_dataset_version()
+        for table in tables:
+            touch_table(table)
+
+
+@receiver(pre_save, sender=results)
+def remember_previous_keys(sender, instance, **kwargs):
+    # ? if a result is moved to another driver or race, both old and new rows have to be rebuilt
+    instance._previous_keys = None
+    if instance.pk is not None:
+        instance._previous_keys = sender.objects.filter(pk=instance.pk).values_list("driver_id", "race_id").first()
+
+
+@receiver(post_save, sender=results)
+def result_saved(sender, instance, **kwargs):
+    driver_ids, race_ids = {instance.driver_id_id}, {instance.race_id_id}
+    previous = getattr(instance, "_previous_keys", None)
+    if previous is not None:
+        driver_ids.add(previous[0])
+        race_ids.add(previous[1])
+    schedule_rebuild(driver_ids, race_ids)
+
+
+@receiver(post_delete, sender=results)
+def result_deleted(sender, instance, **kwargs):
+    schedule_rebuild({instance.driver_id_id}, {instance.race_id_id})
+
+
+def touch_result_seasons(*race_ids):
+    for year in races.objects.filter(pk__in=race_ids).values_list("year", flat=True).distinct():
+        touch_table("results", season=year)
+
+
+def dataset_changed(sender, **kwargs):
+    schedule_rebuild(tables={sender._meta.model_name})
+
+
+for model in (Formula1Data, drivers, constructors, circuits, races, results):
+    post_save.connect(dataset_changed, sender=model, dispatch_uid=f"Formula1_dataset_saved_{model.__name__}")
+    post_delete.connect(dataset_changed, sender=model, dispatch_uid=f"Formula1_dataset_deleted_{model.__name__}")
@@ -0,0 +1,130 @@
+from itertools import groupby
+from django.db import transaction
+from django.db.models import Q, Subquery
+from .models import races, results, driverStandings, constructorStandings
+
+
+def _raced_rounds(year):
+    # ? rounds without results (cancelled or not run yet) never get a standings table
+    return races.objects.filter(year=year, results__isnull=False).distinct()
+
+
+def _ranked(table):
+    # ? table is {id: [points, wins]}, ties are split by wins and then by id so positions are stable
+    ordered = sorted(table.items(), key=lambda i: (-i[1][0], -i[1][1], i[0]))
+    return [(key, points, wins, position) for position, (key, (points, wins)) in enumerate(ordered, start=1)]
+
+
+def _add_round(driver_table, constructor_table, round_results):
+    # ? round_results are (driver, constructor, points, final_position) rows of one race
+    winners = set()
+    for driver, constructor, points, position in round_results:
+        won = position == "1"
+        driver_row = driver_table.setdefault(driver, [0, 0])
+        driver_row[0] += points
+        driver_row[1] += won
+        constructor_row = constructor_table.setdefault(constructor, [0, 0])
+        constructor_row[0] += points
+        if won and constructor not in winners:
+            winners.add(constructor)
+            constructor_row[1] += 1
+
+
+def _standing_rows(race_id, driver_table, constructor_table, driver_model=driverStandings, constructor_model=constructorStandings):
+    return ([driver_model(race_id_id=race_id, driver_id_id=key, points=points, position=position, wins_in_season=wins)
+             for key, points, wins, position in _ranked(driver_table)],
+            [constructor_model(race_id_id=race_id, constructor_id_id=key, points=points, position=position, wins_in_season=wins)
+             for key, points, wins, position in _ranked(constructor_table)])
+
+
+def update_round_standings(race):
+    """builds the tables after `race` from the previous round's tables plus this round's results"""
+    round_results = list(results.objects.filter(race_id=race).values_list("driver_id", "constructor_id", "points", "final_position"))
+    if not round_results:
+        # ? a round whose last result was deleted has no table anymore, later rounds carry on from the round before
+        with transaction.atomic():
+            driverStandings.objects.filter(race_id=race).delete()
+            constructorStandings.objects.filter(race_id=race).delete()
+        return
+
+    previous = _raced_rounds(race.year).filter(round__lt=race.round).order_by("-round").first()
+    driver_table, constructor_table = {}, {}
+
+    if previous is not None:
+        if not driverStandings.objects.filter(race_id=previous).exists():
+            update_round_standings(previous)
+        for driver, points, wins in driverStandings.objects.filter(race_id=previous).values_list("driver_id", "points", "wins_in_season"):
+            driver_table[driver] = [points, wins]
+        for constructor, points, wins in constructorStandings.objects.filter(race_id=previous).values_list("constructor_id", "points", "wins_in_season"):
+            constructor_table[constructor] = [points, wins]
+
+    _add_round(driver_table, constructor_table, round_results)
+    driver_rows, constructor_rows = _standing_rows(race.race_id, driver_table, constructor_table)
+    with transaction.atomic():
+        driverStandings.objects.filter(race_id=race).delete()
+        constructorStandings.objects.filter(race_id=race).delete()
+        driverStandings.objects.bulk_create(driver_rows)
+        constructorStandings.objects.bulk_create(constructor_rows)
+
+
+def season_rows(year, result_model=results, driver_model=driverStandings, constructor_model=constructorStandings):
+    """
+    the standings rows after every raced round of `year`, built from a single query.
+    The models are passed in so migrations can reuse it
+    """
+    rows = (result_model.objects.filter(race_id__year=year).order_by("race_id__round", "race_id")
+            .values_list("race_id", "driver_id", "constructor_id", "points", "final_position"))
+    driver_table, constructor_table = {}, {}
+    driver_rows, constructor_rows = [], []
+    for race_id, round_results in groupby(rows, key=lambda i: i[0]):
+        _add_round(driver_table, constructor_table, [i[1:] for i in round_results])
+        round_drivers, round_constructors = _standing_rows(race_id, driver_table, constructor_table, driver_model, constructor_model)
+        driver_rows += round_drivers
+        constructor_rows += round_constructors
+    return driver_rows, constructor_rows
+
+
+def update_standings_from(race_id):
+    """recomputes the round of `race_id` and every later round of that season that already has standings"""
+    update_standings_for([race_id])
+
+
+def update_standings_for(race_ids):
+    """
+    recomputes the rounds of `race_ids` and every later round of their seasons that already has standings,
+    each round once, starting from the earliest changed round of every season
+    """
+    first_rounds = {}
+    for year, round_number in races.objects.filter(pk__in=race_ids).values_list("year", "round"):
+        first_rounds[year] = min(round_number, first_rounds.get(year, round_number))
+    for year, first_round in first_rounds.items():
+        rounds = (races.objects.filter(year=year, round__gte=first_round)
+                  .filter(Q(pk__in=race_ids) | Q(season_driver_standing__isnull=False)).distinct().order_by("round"))
+        for i in rounds:
+            update_round_standings(i)
+
+
+def rebuild_season(year):
+    driver_rows, constructor_rows = season_rows(year)
+    with transaction.atomic():
+        driverStandings.objects.filter(race_id__year=year).delete()
+        constructorStandings.objects.filter(race_id__year=year).delete()
+        driverStandings.objects.bulk_create(driver_rows, batch_size=1000)
+        constructorStandings.objects.bulk_create(constructor_rows, batch_size=1000)
+    return len({i.race_id_id for i in driver_rows})
+
+
+def _season_table(model, related, year, round_number):
+    table = model.objects.filter(race_id__year=year)
+    if round_number is None:
+        # ? latest computed round, resolved inside the same statement
+        round_number = Subquery(model.objects.filter(race_id__year=year).order_by("-race_id__round").values("race_id__round")[:1])
+    return table.filter(race_id__round=round_number).select_related(related).order_by("position")
+
+
+def driver_table(year, round_number=None):
+    return _season_table(driverStandings, "driver_id", year, round_number)
+
+
+def constructor_table(year, round_number=None):
+    return _season_table(constructorStandings, "constructor_id", year, round_number)
@@ -1,3 +1,194 @@
+import datetime
+import warnings
+from unittest import mock
+from django.core.cache import CacheKeyWarning
+from django.core.cache import cache
+from django.db import transaction
 from django.test import TestCase
+from . import signals
+from .models import circuits, constructors, drivers, races, results, driverStandings, constructorStandings
+from .matrix import season_matrix
+from .pagination import encode_cursor, keyset_paginate
+from .search import search_drivers
+from .standings import driver_table, rebuild_season
 
-# Create your tests here.
+
+class F1DataMixin:
+    """a season of `rounds` races at one circuit, plus helpers that add drivers and their results"""
+
+    @classmethod
+    def make_season(cls, year=2021, rounds=3):
+        circuit = circuits.objects.create(ref_name="monza", name="Monza", location="Monza", country="Italy")
+        season = [races.objects.create(circuit_id=circuit, year=year, round=i, name=f"Grand Prix {i}",
+                                       race_date=datetime.date(year, 3, 1) + datetime.timedelta(weeks=2 * i))
+                  for i in range(1, rounds + 1)]
+        return season
+
+    @classmethod
+    def make_driver(cls, first_name, last_name, number=0, nationality="British"):
+        return drivers.objects.create(ref_name=last_name.lower(), number=number, code=last_name[:3].upper(), first_name=first_name,
+                                      last_name=last_name, date_of_birth=datetime.date(1990, 1, 1), nationality=nationality)
+
+    @classmethod
+    def make_result(cls, race, driver, constructor, position, points):
+        return results.objects.create(race_id=race, driver_id=driver, constructor_id=constructor, car_number=driver.number,
+                                      starting_grid_position=position, final_position=str(position), points=points, laps=50,
+                                      time="1:30:00.000" if position == 1 else f"+{position}.000",
+                                      fastest_lap=datetime.timedelta(minutes=1, seconds=20), top_speed_of_fl=320.0)
+
+
+class ResultSignalTests(F1DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.season = cls.make_season()
+        cls.team = constructors.objects.create(ref_name="mclaren", name="McLaren", nationality="British")
+        cls.drivers = [cls.make_driver("Driver", f"Number{i}", number=i) for i in range(1, 5)]
+
+    def test_an_import_rebuilds_every_race_once(self):
+        with mock.patch.object(signals, "classify_race", wraps=signals.classify_race) as classify, \
+                mock.patch.object(signals, "rebuild_driver_stints", wraps=signals.rebuild_driver_stints) as stints:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for race in self.season:
+                        for position, driver in enumerate(self.drivers, start=1):
+                            self.make_result(race, driver, self.team, position, 10 - position)
+                    self.assertFalse(driverStandings.objects.exists())
+
+        self.assertEqual(classify.call_count, len(self.season))
+        self.assertEqual(stints.call_count, len(self.drivers))
+        self.assertEqual(driverStandings.objects.filter(race_id=self.season[-1]).get(position=1).points, 27)
+        self.assertEqual(results.objects.filter(race_id=self.season[0], final_position="2").get().gap_ms, 2000)
+
+
+class StandingsTests(F1DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.season = cls.make_season(rounds=3)
+        cls.team = constructors.objects.create(ref_name="mclaren", name="McLaren", nationality="British")
+        cls.first, cls.second = cls.make_driver("Lando", "Norris", 4), cls.make_driver("Oscar", "Piastri", 81)
+
+    def race(self, race, winner, runner_up):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [self.make_result(race, winner, self.team, 1, 25), self.make_result(race, runner_up, self.team, 2, 18)]
+
+    def table(self, race):
+        return list(driverStandings.objects.filter(race_id=race).order_by("position").values_list("driver_id__last_name", "points", "wins_in_season"))
+
+    def test_tables_carry_forward(self):
+        self.race(self.season[0], self.first, self.second)
+        self.race(self.season[1], self.second, self.first)
+        self.assertEqual(self.table(self.season[1]), [("Norris", 43, 1), ("Piastri", 43, 1)])
+        self.assertEqual(constructorStandings.objects.get(race_id=self.season[1]).points, 86)
+        self.assertEqual([i.driver_id.last_name for i in driver_table(2021)], ["Norris", "Piastri"])
+
+        # ? editing round 1 cascades to round 2
+        with self.captureOnCommitCallbacks(execute=True):
+            results.objects.filter(race_id=self.season[0], driver_id=self.second).update(points=0)
+            results.objects.get(race_id=self.season[0], driver_id=self.second).save()
+        self.assertEqual(self.table(self.season[1]), [("Norris", 43, 1), ("Piastri", 25, 1)])
+
+    def test_deleting_the_last_result_of_a_round_drops_its_table(self):
+        self.race(self.season[0], self.first, self.second)
+        second_round = self.race(self.season[1], self.second, self.first)
+        self.race(self.season[2], self.first, self.second)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in second_round:
+                i.delete()
+        self.assertFalse(driverStandings.objects.filter(race_id=self.season[1]).exists())
+        self.assertFalse(constructorStandings.objects.filter(race_id=self.season[1]).exists())
+        self.assertEqual(self.table(self.season[2]), [("Norris", 50, 2), ("Piastri", 36, 0)])
+
+    def test_rebuild_matches_the_incremental_tables(self):
+        for race in self.season:
+            self.race(race, self.first, self.second)
+        incremental = [self.table(i) for i in self.season]
+        self.assertEqual(rebuild_season(2021), 3)
+        self.assertEqual([self.table(i) for i in self.season], incremental)
+
+
+class SeasonMatrixTests(F1DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.season = cls.make_season(rounds=2)
+        cls.earlier = races.objects.create(circuit_id=cls.season[0].circuit_id, year=2020, round=1, name="Grand Prix 1",
+                                           race_date=datetime.date(2020, 3, 1))
+        cls.team = constructors.objects.create(ref_name="mclaren", name="McLaren", nationality="British")
+        cls.first, cls.second = cls.make_driver("Lando", "Norris", 4), cls.make_driver("Oscar", "Piastri", 81)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_a_result_refreshes_the_cached_matrix(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_result(self.season[0], self.first, self.team, 1, 25)
+            self.make_result(self.season[0], self.second, self.team, 2, 18)
+        self.assertEqual(season_matrix(2021)["total_points"], [25, 18])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_result(self.season[1], self.second, self.team, 1, 25)
+            self.make_result(self.season[1], self.first, self.team, 10, 1)
+        matrix = season_matrix(2021)
+        self.assertEqual(matrix["driver_codes"], ["PIA", "NOR"])
+        self.assertEqual(matrix["positions"], [[2, 1], [1, 10]])
+
+        # ? another season's results leave this season's cached matrix alone
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_result(self.earlier, self.first, self.team, 1, 25)
+        with self.assertNumQueries(0):
+            self.assertEqual(season_matrix(2021), matrix)
+
+
+class KeysetPaginationTests(F1DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # ? 45 drivers that all tie on the search rank of "Briti", so only the name columns order them
+        for i in range(45):
+            cls.make_driver(f"Driver{i:02d}", "Same", number=i)
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, queryset, ordering, per_page=20):
+        seen, after = [], None
+        for _ in range(10):
+            page = keyset_paginate(queryset, ordering, after=after, per_page=per_page)
+            seen += [i.driver_id for i in page]
+            if not page.has_next:
+                return seen
+            after = page.next_cursor
+        self.fail("pagination never reached the last page")
+
+    def test_search_ties_page_through_once(self):
+        queryset = search_drivers(drivers.objects.all(), "Briti")
+        ordering = ["-rank", "first_name", "last_name", "driver_id"]
+        self.assertEqual(len({i.rank for i in queryset}), 1)
+        seen = self.walk(queryset, ordering)
+        self.assertEqual(sorted(seen), sorted(drivers.objects.values_list("driver_id", flat=True)))
+
+        page = keyset_paginate(queryset, ordering, before="end", per_page=20)
+        previous = keyset_paginate(queryset, ordering, before=page.previous_cursor, per_page=20)
+        self.assertEqual([i.driver_id for i in previous] + [i.driver_id for i in page], seen[-40:])
+
+    def test_malformed_cursors_are_ignored(self):
+        first_page = self.client.get("/F1/drivers").content
+        for cursor in (encode_cursor(["Driver01", "Same", "x"]), encode_cursor(["Driver01", "Same"]),
+                       encode_cursor([True, "Same", 1]), encode_cursor({"a": 1}), "not a cursor"):
+            for direction in ("after", "before"):
+                response = self.client.get("/F1/drivers", {direction: cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, first_page)
+        response = self.client.get("/F1/drivers", {"search": "Briti", "after": encode_cursor(["1", "Driver01", "Same", 1])})
+        self.assertEqual(response.status_code, 200)
+
+    def test_malformed_cursors_share_the_first_page_entry(self):
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set, warnings.catch_warnings():
+            warnings.simplefilter("error", CacheKeyWarning)
+            for params in ({}, {"after": "not a cursor"}, {"before": encode_cursor({"a": 1})}, {"after": "x" * 300}):
+                self.assertEqual(self.client.get("/F1/drivers", params).status_code, 200)
+        page_keys = {i.args[0] for i in cache_set.call_args_list if i.args[0].startswith("Formula1:page:")}
+        self.assertEqual(len(page_keys), 1)
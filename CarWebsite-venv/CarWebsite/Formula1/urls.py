@@ -8,6 +8,7 @@ urlpatterns = [
     path("circuits/<int:id>/details", circuit_detail_view, name="circuit_details"),
     path("circuits/<int:c_id>/details/race_results/<int:r_id>/details", race_details_view, name="circuit_race_detail"),
     path("races", race_list_view, name="races_list"),
+    path("races/<int:year>", race_season_view, name="race_season"),
     path("races/<int:r_id>/details", race_details_view, name="race_details"),
     path("drivers", driver_list_view, name="drivers_list"),
     path("drivers/<int:id>/details", driver_details_view, name="driver_details"),
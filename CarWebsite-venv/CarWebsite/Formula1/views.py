@@ -1,18 +1,28 @@
 from django.shortcuts import render
-from django.db.models import Q
-from django.core.paginator import Paginator
+from django.http import Http404
+from django.core.cache import cache
+from django.db.models import Q, Min, Max, Count, BooleanField, ExpressionWrapper
 from .models import *
-from .templatetags.custom_tags import driver_team, team_first_last_race
+from .templatetags.custom_tags import driver_team
+from .cache import cached_page, cached_count, dataset_version, PAGE_CACHE_TIMEOUT
+from .pagination import keyset_paginate
+from .search import search_drivers, search_constructors
+from .dashboard import season_dashboard
 import datetime
 
 def main_view(request):
-    season_races = []
-    for i in races.objects.filter(year=2025):
-        season_races.append(i.race_id)
-    race_results = results.objects.filter(race_id__in=season_races, final_position=1).order_by("race_id")
-    return render(request, "F1_main.html", {"results":race_results})
+    dashboard = season_dashboard()
+    context = {
+        "season":dashboard["season"],
+        "results":dashboard["winners"],
+        "next_race":dashboard["next_race"],
+        "driver_leaders":dashboard["driver_leaders"],
+        "constructor_leaders":dashboard["constructor_leaders"],
+    }
+    return render(request, "F1_main.html", context)
 
 
+@cached_page
 def circuit_list_view(request):
     country_no = circuits.objects.distinct("country")
     circuit_data = circuits.objects.values('name', 'country', 'circuit_id').order_by("country")
@@ -36,32 +46,58 @@ def circuit_detail_view(request, id):
     return render(request, "F1_circuit_detail.html", context)
 
 
+def season_races(year):
+    # ? sprint flag and completion status come from the query, so the template runs no per-race lookups
+    today = datetime.date.today()
+    key = f"Formula1:race_season:{dataset_version()}:{year}:{today}"
+    data = cache.get(key)
+    if data is None:
+        data = list(races.objects.filter(year=year)
+                    .annotate(has_sprint=ExpressionWrapper(Q(sprint_race_date__isnull=False), output_field=BooleanField()),
+                              is_completed=ExpressionWrapper(Q(race_date__lt=today), output_field=BooleanField()))
+                    .values('race_id', 'name', 'round', 'race_time', 'race_date', 'circuit_id__name',
+                            'circuit_id__country', 'has_sprint', 'is_completed')
+                    .order_by('round'))
+        cache.set(key, data, PAGE_CACHE_TIMEOUT)
+    return data
+
+
+def race_list_stats():
+    key = f"Formula1:race_stats:{dataset_version()}"
+    stats = cache.get(key)
+    if stats is None:
+        stats = {
+            "total_races":races.objects.count(),
+            "seasons":list(races.objects.values_list('year', flat=True).distinct().order_by('-year')),
+            "total_circuits":circuits.objects.count(),
+        }
+        cache.set(key, stats, PAGE_CACHE_TIMEOUT)
+    return stats
+
+
+@cached_page(daily=True)
 def race_list_view(request):
-    total_races = races.objects.values_list('race_id', 'name', 'round', 'year', 'race_time', 'race_date', 'circuit_id__name',
-                                            'circuit_id__country').order_by('round')
-    
-    total_circuits = circuits.objects.values('circuit_id')
-    # if datetime.datetime.now().month == 12:
-    #     total_seasons = int(datetime.datetime.now().year) - 1950 + 1
-    # else:
-    #     total_seasons = (int(datetime.datetime.now().year) - 1 - 1950) + 1
-
-    races_per_year = {}
-    for i in total_races:
-        races_per_year.setdefault(i[3], []).append(i)
-
-    races_per_year = dict(sorted(races_per_year.items(), reverse=True))
+    stats = race_list_stats()
+    latest_year = stats["seasons"][0] if stats["seasons"] else None
 
     context = {
-        "total_races":len(total_races),
-        "total_years":len(races_per_year),
-        "total_circuits":len(total_circuits),
-        "races_per_year":races_per_year,
-        "latest_year":list(races_per_year.keys())[0],
+        "total_races":stats["total_races"],
+        "total_years":len(stats["seasons"]),
+        "total_circuits":stats["total_circuits"],
+        "seasons":stats["seasons"],
+        "latest_year":latest_year,
+        "season_races":season_races(latest_year) if latest_year else [],
     }
     return render(request, "F1_race_list.html", context)
 
 
+def race_season_view(request, year):
+    data = season_races(year)
+    if not data:
+        raise Http404("no races in this season")
+    return render(request, "F1_race_season.html", {"year":year, "races":data})
+
+
 def race_details_view(request, r_id, c_id=None):
     race_info = races.objects.get(race_id=r_id)
     race_results = race_info.results.all().order_by("result_id")
@@ -73,97 +109,78 @@ def race_details_view(request, r_id, c_id=None):
     return render(request, "F1_race_detail.html", context)
 
 
+@cached_page
 def driver_list_view(request):
 
     search_query = request.GET.get('search', '').strip()
     queryset = driver_team()
     
+    ordering = ["first_name", "last_name", "driver_id"]
     if search_query:
-        q = Q()
-        terms = search_query.split()
-        for term in terms:
-            q &= (
-                Q(first_name__icontains=term) |
-                Q(last_name__icontains=term) |
-                Q(number__icontains=term) |
-                Q(nationality__icontains=term)
-            )
-        queryset = queryset.filter(q)
+        queryset = search_drivers(queryset, search_query)
+        ordering = ["-rank"] + ordering
 
     teams = constructors.objects.distinct('constructor_id')
     nationalities = drivers.objects.distinct('nationality')
-    paginator = Paginator(queryset, per_page=20)
-    page_number = request.GET.get('page')
-    all_drivers = paginator.get_page(page_number)
+    total_drivers = cached_count("drivers", queryset, search_query)
+    all_drivers = keyset_paginate(queryset, ordering, after=request.GET.get('after'),
+                                  before=request.GET.get('before'), per_page=20, total=total_drivers)
     context = {
         "total_teams":len(teams),
         "total_nationalities":len(nationalities),
-        "total_drivers":len(queryset),
+        "total_drivers":total_drivers,
         "all_drivers":all_drivers,
+        "search_query":search_query,
     }
     return render(request, "F1_driver_list.html", context)
 
 
 def driver_details_view(request, id):
     driver_data = drivers.objects.get(driver_id=id)
-    driver_results = driver_data.results.all().order_by("race_id__year")
-    years = driver_results.values("race_id__year").distinct("race_id__year")
-    
+
     # ? --- teams during driver cereer ---
-    key = ""
-    #last_team = ""
-    temp_data = {}
-    for i in range(len(list(years.values()))):
-        team = driver_results.filter(race_id=list(years.values())[i]['race_id_id'])[0].constructor_id
-        key = driver_results.filter(constructor_id=team.constructor_id).values('race_id__year').distinct('race_id__year')
-        temp_data[team] = [i["race_id__year"] for i in key]
-        if i + 1 == len(list(years.values())):
-            last_team = team
-    team_data = {}
-    for i,j in temp_data.items():
-        if len(j) > 1:
-            team_data[i] = f"{j[0]} - {j[-1]}"
-        elif j[0] == datetime.date.today().year:
-            team_data[i] = f"{j[0]} - present"
-        else:
-            team_data[i] = f"{j[0]}"
+    stints = list(driver_data.career_stints.select_related("constructor_id").order_by("first_season", "last_season"))
+    team_data = {i.constructor_id: i.season_range() for i in stints}
+    last_team = max(stints, key=lambda i: (i.last_season, i.first_season)).constructor_id if stints else None
 
     result_data = {}
-    for i in years:
-        result_data[i['race_id__year']] = driver_results.filter(race_id__year = i['race_id__year']).order_by("result_id")
+    for i in driver_data.results.select_related("race_id", "constructor_id").order_by("race_id__year", "result_id"):
+        result_data.setdefault(i.race_id.year, []).append(i)
 
     context = {
         "driver":driver_data,
         "last_team":last_team,
         "career_history":team_data,
-        "seasons":sorted([i["race_id__year"] for i in years], reverse=True),
+        "seasons":sorted(result_data.keys(), reverse=True),
         "results_by_season":result_data
 
     }
     return render(request, "F1_driver_details.html", context)
 
 
+@cached_page
 def teams_list_view(request):
-    teams_data = constructors.objects.all().order_by("name")
+    teams_data = constructors.objects.annotate(first_season=Min("results__race_id__year"),
+                                               last_season=Max("results__race_id__year"),
+                                               total_seasons=Count("results__race_id__year", distinct=True)).order_by("name")
     nationalities = constructors.objects.distinct('nationality')
     active_teams = results.objects.filter(race_id__year=datetime.date.today().year).distinct('constructor_id')
 
     search_query = request.GET.get('search', '').strip()
+    ordering = ["name", "constructor_id"]
     if search_query:
-        q = Q()
-        queries = search_query.split()
-        for i in queries:
-            q &= (Q(name__icontains=i))
-        teams_data = teams_data.filter(q)
+        teams_data = search_constructors(teams_data, search_query)
+        ordering = ["-rank"] + ordering
 
-    paginator = Paginator(teams_data, per_page=20)
-    page_number = request.GET.get("page")
-    all_teams = paginator.get_page(page_number)
+    total_teams = cached_count("teams", teams_data, search_query)
+    all_teams = keyset_paginate(teams_data, ordering, after=request.GET.get("after"),
+                                before=request.GET.get("before"), per_page=20, total=total_teams)
 
     context = {
-        "total_teams":len(teams_data),
+        "total_teams":total_teams,
         "total_nationalities":len(nationalities),
         "active_teams":len(active_teams),
         "all_teams":all_teams,
+        "search_query":search_query,
     }
     return render(request, "F1_teams_list.html", context)
\ No newline at end of file